@@ -5,8 +5,27 @@ MediocreToons Auto Uploader v2
 """
 
 from flask import Flask, render_template, jsonify
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from pathlib import Path
 
+import orjson
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider JSON do Flask baseado em orjson (serialização em Rust)"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Configurar o diretório correto para templates e static
 template_dir = Path(__file__).parent / "web_app" / "templates"
 static_dir = Path(__file__).parent / "web_app" / "static"
@@ -15,9 +34,26 @@ app = Flask(__name__,
            template_folder=str(template_dir),
            static_folder=str(static_dir),
            static_url_path='/static')
+app.json = OrjsonProvider(app)
+# Respostas JSON compactas mesmo com debug=True (sem indentação)
+app.json.compact = True
 
 app.secret_key = 'design-demo-key'
 
+# Templates compilados uma única vez: sem checagem de mtime por request
+# e bytecode persistido em disco entre execuções. As opções entram antes da
+# criação do jinja_env para que um único Environment já nasça configurado,
+# com cache de templates ilimitado (cache_size=-1, sem despejo LRU).
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+jinja_cache_dir = template_dir / ".jinja_cache"
+jinja_cache_dir.mkdir(exist_ok=True)
+app.jinja_options = {
+    **app.jinja_options,
+    'auto_reload': False,
+    'cache_size': -1,
+    'bytecode_cache': FileSystemBytecodeCache(directory=str(jinja_cache_dir)),
+}
+
 @app.route('/')
 def index():
     """Dashboard principal com dados mock para demonstração do design"""
@@ -1,9 +1,24 @@
 #!/usr/bin/env python3
 """
 Script para executar a aplicação Flask contornando problemas de imports
+
+Uso:
+    python run_app.py              # Uvicorn (ASGI) - desenvolvimento
+    python run_app.py dev          # Werkzeug com auto-reload (reloader stat)
+    python run_app.py production   # Gunicorn + workers gevent
 """
 
 import sys
+
+MODE = sys.argv[1] if len(sys.argv) > 1 else 'asgi'
+PRODUCTION = MODE == 'production'
+
+if PRODUCTION:
+    # gevent precisa aplicar o monkey patch antes de qualquer outro import
+    # para que os sockets da stdlib (requests/aiohttp) sejam cooperativos
+    from gevent import monkey
+    monkey.patch_all()
+
 import os
 from pathlib import Path
 
@@ -14,29 +29,91 @@ sys.path.insert(0, str(current_dir / "src"))
 
 # Definir variáveis de ambiente necessárias
 os.environ['PYTHONPATH'] = str(current_dir)
-os.environ['FLASK_ENV'] = 'development'
-os.environ['FLASK_DEBUG'] = '1'
+if not PRODUCTION:
+    os.environ['FLASK_ENV'] = 'development'
+    os.environ['FLASK_DEBUG'] = '1'
+
+
+def run_production(app):
+    """Executa o app sob Gunicorn com workers gevent (I/O-bound)"""
+    from gunicorn.app.base import BaseApplication
+
+    class GunicornApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    GunicornApplication(app, {
+        'bind': '0.0.0.0:5000',
+        'worker_class': 'gevent',
+        'workers': 4,
+        'worker_connections': 1000,
+    }).run()
+
+
+def run_reloader(app):
+    """Executa o app no Werkzeug com auto-reload por polling de mtime"""
+    # reloader 'stat' em vez de 'watchdog': o watchdog consome CPU
+    # continuamente observando a árvore inteira mesmo com o app ocioso.
+    # app.run() não repassa reloader_type, por isso run_simple direto.
+    from werkzeug.serving import run_simple
+
+    run_simple(
+        '0.0.0.0',
+        5000,
+        app,
+        use_debugger=True,
+        use_reloader=True,
+        reloader_type='stat',
+        reloader_interval=2
+    )
+
+
+def run_development(app):
+    """Executa o app sob Uvicorn (ASGI)"""
+    # Servidor ASGI (Uvicorn) no lugar do servidor de desenvolvimento do
+    # Werkzeug: requisições concorrentes sem uma thread por conexão.
+    # loop='auto' usa uvloop quando disponível (não existe no Windows).
+    import uvicorn
+    from asgiref.wsgi import WsgiToAsgi
+
+    uvicorn.run(
+        WsgiToAsgi(app),
+        host='0.0.0.0',
+        port=5000,
+        workers=1,
+        loop='auto'
+    )
+
 
 try:
     from src.web_interface.app import create_app
-    
+
     # Criar e executar app
-    app = create_app('development')
-    
+    app = create_app('production' if PRODUCTION else 'development')
+
     print("🚀 Iniciando aplicação Flask...")
     print("📍 Acesse: http://localhost:5000")
     print("🗂️  Mapeamento: http://localhost:5000/mapping")
     print("⚙️  Configurações: http://localhost:5000/config")
     print("📊 Dashboard: http://localhost:5000/dashboard")
-    
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=True,
-        use_reloader=False  # Evita problemas de import duplo
-    )
-    
+
+    if PRODUCTION:
+        run_production(app)
+    elif MODE == 'dev':
+        run_reloader(app)
+    else:
+        run_development(app)
+
 except Exception as e:
     print(f"❌ Erro ao executar aplicação: {e}")
     import traceback
-    traceback.print_exc()
\ No newline at end of file
+    traceback.print_exc()
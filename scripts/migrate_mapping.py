@@ -6,24 +6,42 @@ Converte obras_mapeadas.json do formato antigo (auto_upload_base) para o novo fo
 import json
 import sys
 import shutil
+import subprocess
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Optional
-from urllib.parse import urlparse
+from typing import Dict, List, Any, Tuple, Optional, Union, Iterator
+from urllib.parse import urlparse, ParseResult
+from concurrent.futures import ThreadPoolExecutor
+import math
 import uuid
 import argparse
 
+import orjson
+
+import ijson
+import numpy as np
+
 
 class MigrationError(Exception):
     """Erro durante migração"""
     pass
 
 
+def _chapter_as_float(cap_num: Any) -> float:
+    """Converte número de capítulo para float (NaN se não for numérico)"""
+    try:
+        return float(cap_num)
+    except (TypeError, ValueError):
+        return math.nan
+
+
 class MigrationReporter:
     """Relatório detalhado da migração"""
     
     def __init__(self):
         self.start_time = datetime.now()
+        self._start_perf = time.perf_counter()
         self.total_obras = 0
         self.migrated_obras = 0
         self.skipped_obras = 0
@@ -36,7 +54,7 @@ class MigrationReporter:
         """Adiciona erro ao relatório"""
         error_info = {
             "message": message,
-            "timestamp": datetime.now().isoformat(),
+            "_perf": time.perf_counter(),  # Formatado só em generate_report
             "obra": obra_data.get("nome_mediocre") if obra_data else None
         }
         self.errors.append(error_info)
@@ -45,7 +63,7 @@ class MigrationReporter:
         """Adiciona aviso ao relatório"""
         warning_info = {
             "message": message,
-            "timestamp": datetime.now().isoformat(),
+            "_perf": time.perf_counter(),  # Formatado só em generate_report
             "obra": obra_data.get("nome_mediocre") if obra_data else None
         }
         self.warnings.append(warning_info)
@@ -54,6 +72,18 @@ class MigrationReporter:
         """Atualiza estatísticas por scan"""
         self.scan_stats[scan_name] = self.scan_stats.get(scan_name, 0) + count
     
+    def _format_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Converte os offsets de perf_counter das entradas em timestamps ISO"""
+        base = self.start_time.timestamp() - self._start_perf
+        return [
+            {
+                "message": entry["message"],
+                "timestamp": datetime.fromtimestamp(base + entry["_perf"]).isoformat(),
+                "obra": entry["obra"]
+            }
+            for entry in entries
+        ]
+    
     def generate_report(self) -> Dict[str, Any]:
         """Gera relatório final"""
         end_time = datetime.now()
@@ -71,8 +101,8 @@ class MigrationReporter:
             },
             "scan_distribution": self.scan_stats,
             "backup_files": self.backup_files,
-            "errors": self.errors,
-            "warnings": self.warnings,
+            "errors": self._format_entries(self.errors),
+            "warnings": self._format_entries(self.warnings),
             "status": "SUCCESS" if len(self.errors) == 0 else "PARTIAL" if self.migrated_obras > 0 else "FAILED"
         }
 
@@ -94,6 +124,9 @@ class OldFormatMigrator:
         self.backup_dir = self.data_dir / "backups"
         self.reporter = MigrationReporter()
         
+        # Timestamp único da execução: a migração é tratada como atômica
+        self._now_iso = datetime.now(timezone.utc).isoformat()
+        
         # Mapeamento de domínios para nomes de scan
         self.domain_mappings = {
             "astratoons.com": "astratoons",
@@ -108,16 +141,25 @@ class OldFormatMigrator:
             "mangaschan.net": "mangaschan"
         }
         
+        # Domínios casam por sufixo (maior sufixo primeiro); a tupla permite
+        # descartar URLs sem mapeamento com um único str.endswith em C
+        self._suffix_map = tuple(sorted(
+            self.domain_mappings.items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        ))
+        self._suffix_tuple = tuple(mapped_domain for mapped_domain, _ in self._suffix_map)
+        
         # Garantir que diretórios existem
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.backup_dir.mkdir(parents=True, exist_ok=True)
     
-    def detect_scan_from_url(self, url: str) -> str:
+    def detect_scan_from_url(self, url: Union[str, ParseResult]) -> str:
         """
         Detecta o scan baseado na URL
         
         Args:
-            url: URL da obra
+            url: URL da obra ou resultado já parseado de urlparse(url.lower())
             
         Returns:
             Nome do scan detectado ou 'unknown'
@@ -126,13 +168,14 @@ class OldFormatMigrator:
             if not url:
                 return "unknown"
             
-            parsed = urlparse(url.lower())
+            parsed = url if isinstance(url, ParseResult) else urlparse(url.lower())
             domain = parsed.netloc.replace("www.", "")
             
-            # Busca mapeamento exato
-            for mapped_domain, scan_name in self.domain_mappings.items():
-                if domain == mapped_domain or mapped_domain in domain:
-                    return scan_name
+            # Busca mapeamento exato ou subdomínio de um domínio mapeado
+            if domain.endswith(self._suffix_tuple):
+                for mapped_domain, scan_name in self._suffix_map:
+                    if domain == mapped_domain or domain.endswith("." + mapped_domain):
+                        return scan_name
             
             # Se não encontrou, usa o domínio como nome do scan
             if domain:
@@ -172,8 +215,8 @@ class OldFormatMigrator:
             "tags": [],
             "autor": None,
             "descricao": None,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": self._now_iso,
+            "updated_at": self._now_iso,
             "id_obra_original": obra_id  # Mantém referência ao ID original
         }
         
@@ -181,34 +224,39 @@ class OldFormatMigrator:
         old_capitulos = old_obra.get("capitulos", [])
         if old_capitulos:
             try:
-                # Converte para números e ordena
-                capitulos_numericos = []
-                for cap_num in old_capitulos:
-                    try:
-                        if isinstance(cap_num, str):
-                            try:
-                                numero = float(cap_num)
-                            except ValueError:
-                                # Se não conseguir converter, usa string como está
-                                numero = cap_num
-                        else:
-                            numero = cap_num
-                        capitulos_numericos.append(numero)
-                    except Exception:
-                        continue
-                
-                # Ordena e pega os 2 últimos
-                if capitulos_numericos:
-                    capitulos_numericos.sort(key=lambda x: float(x) if isinstance(x, (int, float)) else 0)
-                    ultimos_capitulos = capitulos_numericos[-2:]  # Últimos 2
+                # Seleção dos 2 maiores em O(N) (argpartition), sem ordenar tudo
+                valores = np.fromiter(
+                    (_chapter_as_float(c) for c in old_capitulos),
+                    dtype=np.float64,
+                    count=len(old_capitulos)
+                )
+                numericos = np.flatnonzero(~np.isnan(valores))
+                if numericos.size >= 2:
+                    indices = numericos
+                    if indices.size > 2:
+                        indices = indices[np.argpartition(valores[indices], -2)[-2:]]
+                    indices = sorted(indices.tolist(), key=lambda i: (valores[i], i))
                     
-                    for cap_numero in ultimos_capitulos:
-                        capitulo = {
-                            "numero": cap_numero,
-                            "data_upload": None,
-                            "status": "baixado"  # Assume que capítulos já existentes foram baixados
-                        }
-                        new_obra["capitulos"].append(capitulo)
+                    ignorados = len(old_capitulos) - numericos.size
+                    if ignorados:
+                        self.reporter.add_warning(
+                            f"{ignorados} capítulo(s) não numérico(s) ignorado(s)", old_obra
+                        )
+                else:
+                    # Menos de 2 capítulos numéricos: mantém os não numéricos
+                    # (ex.: "Extra", "oneshot") com chave 0, como antes
+                    chaves = np.nan_to_num(valores, nan=0.0)
+                    indices = np.argsort(chaves, kind="stable")[-2:].tolist()
+                
+                for i in indices:
+                    cap_num = old_capitulos[i]
+                    numerico = not math.isnan(valores[i])
+                    capitulo = {
+                        "numero": float(valores[i]) if isinstance(cap_num, str) and numerico else cap_num,
+                        "data_upload": None,
+                        "status": "baixado"  # Assume que capítulos já existentes foram baixados
+                    }
+                    new_obra["capitulos"].append(capitulo)
                 
             except Exception as e:
                 self.reporter.add_warning(f"Erro ao processar capítulos: {e}", old_obra)
@@ -219,6 +267,19 @@ class OldFormatMigrator:
         
         return new_obra
     
+    def iter_old_obras(self, old_file: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Itera as obras do obras_mapeadas.json antigo em streaming
+        
+        Args:
+            old_file: Arquivo obras_mapeadas.json antigo
+            
+        Yields:
+            Cada obra no formato antigo
+        """
+        with open(old_file, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    
     def load_or_create_scan_data(self, scan_name: str, base_url: str = "") -> Dict[str, Any]:
         """
         Carrega dados existentes do scan ou cria novo
@@ -235,8 +296,8 @@ class OldFormatMigrator:
         if scan_file.exists():
             # Carrega dados existentes
             try:
-                with open(scan_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(scan_file, 'rb') as f:
+                    return orjson.loads(f.read())
             except Exception as e:
                 self.reporter.add_warning(f"Erro ao carregar {scan_file}: {e}")
         
@@ -278,8 +339,12 @@ class OldFormatMigrator:
             scan_data["metadata"]["total_obras"] = len(scan_data["obras"])
             
             # Salva arquivo
-            with open(scan_file, 'w', encoding='utf-8') as f:
-                json.dump(scan_data, f, indent=2, ensure_ascii=False, default=str)
+            with open(scan_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    scan_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                ))
             
             return True
             
@@ -304,7 +369,18 @@ class OldFormatMigrator:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = self.backup_dir / f"obras_mapeadas_backup_{timestamp}.json"
             
-            shutil.copy2(source_file, backup_file)
+            # Reflink/CoW (O(1) em Btrfs/XFS) via cp, que faz cópia completa nos
+            # demais filesystems; sem cp, shutil.copy2. Hardlink não serve: o
+            # original pode ser reescrito no lugar e levaria o backup junto.
+            try:
+                subprocess.run(
+                    ["cp", "--reflink=auto", "--preserve=timestamps", str(source_file), str(backup_file)],
+                    check=True,
+                    capture_output=True
+                )
+            except (OSError, subprocess.CalledProcessError):
+                shutil.copy2(source_file, backup_file)
+            
             self.reporter.backup_files.append(str(backup_file))
             
             return backup_file
@@ -396,81 +472,91 @@ class OldFormatMigrator:
                 else:
                     print("⚠️ Não foi possível criar backup")
             
-            # Carrega dados antigos
+            # Primeira passada (streaming): detecta o scan de cada obra sem
+            # manter o arquivo antigo inteiro em memória
             print("📖 Carregando dados antigos...")
-            with open(old_file, 'r', encoding='utf-8') as f:
-                old_data = json.load(f)
-            
-            self.reporter.total_obras = len(old_data)
-            print(f"   Total de obras encontradas: {self.reporter.total_obras}")
-            print()
-            
-            # Agrupa obras por scan
-            scan_grupos = {}
+            print("🔍 Detectando scans por URL...")
+            scan_por_obra = []
+            scan_counts = {}
+            scan_base_urls = {}
             unknown_count = 0
             
-            print("🔍 Detectando scans por URL...")
-            for obra in old_data:
+            for obra in self.iter_old_obras(old_file):
+                # URL parseada uma única vez: reaproveitada na URL base do scan
                 url = obra.get("link_download", "")
-                scan_name = self.detect_scan_from_url(url)
+                parsed = urlparse(url.lower()) if url else None
+                scan_name = self.detect_scan_from_url(parsed)
                 
                 if scan_name == "unknown":
                     unknown_count += 1
                 
-                if scan_name not in scan_grupos:
-                    scan_grupos[scan_name] = []
+                scan_counts[scan_name] = scan_counts.get(scan_name, 0) + 1
+                if not scan_base_urls.get(scan_name) and parsed is not None and parsed.netloc:
+                    scan_base_urls[scan_name] = f"{parsed.scheme}://{parsed.netloc}"
+                else:
+                    scan_base_urls.setdefault(scan_name, "")
                 
-                scan_grupos[scan_name].append(obra)
+                scan_por_obra.append(scan_name)
             
-            print(f"   Scans detectados: {list(scan_grupos.keys())}")
+            self.reporter.total_obras = len(scan_por_obra)
+            print(f"   Total de obras encontradas: {self.reporter.total_obras}")
+            print(f"   Scans detectados: {list(scan_counts.keys())}")
             print(f"   Obras sem URL identificável: {unknown_count}")
             print()
             
-            # Processa cada scan
-            for scan_name, obras in scan_grupos.items():
-                print(f"📦 Processando scan '{scan_name}' ({len(obras)} obras)...")
-                
-                # Determina URL base
-                base_url = ""
-                for obra in obras:
-                    url = obra.get("link_download", "")
-                    if url:
-                        try:
-                            parsed = urlparse(url)
-                            base_url = f"{parsed.scheme}://{parsed.netloc}"
-                            break
-                        except:
-                            pass
-                
-                # Carrega ou cria dados do scan
+            # Carrega ou cria dados de cada scan
+            scans = {}
+            for scan_name, base_url in scan_base_urls.items():
                 scan_data = self.load_or_create_scan_data(scan_name, base_url)
+                scans[scan_name] = {
+                    "data": scan_data,
+                    "existing_titles": frozenset(obra.get("titulo", "").casefold() for obra in scan_data["obras"]),
+                    "seen_titles": set(),
+                    "added_count": 0
+                }
+            
+            # Segunda passada (streaming): converte cada obra e a descarta
+            print("🔄 Convertendo obras...")
+            for scan_name, old_obra in zip(scan_por_obra, self.iter_old_obras(old_file)):
+                scan = scans[scan_name]
+                try:
+                    new_obra = self.convert_obra_to_new_format(old_obra)
+                    
+                    # Verifica duplicatas por título (normalizado uma única vez)
+                    titulo_key = new_obra["titulo"].casefold()
+                    if titulo_key in scan["existing_titles"] or titulo_key in scan["seen_titles"]:
+                        self.reporter.add_warning(f"Obra duplicada ignorada: {new_obra['titulo']}", old_obra)
+                        self.reporter.skipped_obras += 1
+                        continue
+                    
+                    # Adiciona obra
+                    scan["data"]["obras"].append(new_obra)
+                    scan["seen_titles"].add(titulo_key)
+                    scan["added_count"] += 1
+                    self.reporter.migrated_obras += 1
+                    
+                except Exception as e:
+                    self.reporter.add_error(f"Erro ao converter obra: {e}", old_obra)
+            print()
+            
+            # Salva os arquivos de scan em paralelo (escritas independentes)
+            save_results = {}
+            if not dry_run and scans:
+                with ThreadPoolExecutor(max_workers=min(8, len(scans))) as executor:
+                    saved = executor.map(
+                        lambda item: self.save_scan_data(item[0], item[1]["data"]),
+                        scans.items()
+                    )
+                    save_results = dict(zip(scans.keys(), saved))
+            
+            # Processa cada scan
+            for scan_name, scan in scans.items():
+                print(f"📦 Processando scan '{scan_name}' ({scan_counts[scan_name]} obras)...")
+                added_count = scan["added_count"]
                 
-                # Converte obras
-                existing_titles = {obra.get("titulo", "").lower() for obra in scan_data["obras"]}
-                added_count = 0
-                
-                for old_obra in obras:
-                    try:
-                        new_obra = self.convert_obra_to_new_format(old_obra)
-                        
-                        # Verifica duplicatas por título
-                        if new_obra["titulo"].lower() in existing_titles:
-                            self.reporter.add_warning(f"Obra duplicada ignorada: {new_obra['titulo']}", old_obra)
-                            self.reporter.skipped_obras += 1
-                            continue
-                        
-                        # Adiciona obra
-                        scan_data["obras"].append(new_obra)
-                        existing_titles.add(new_obra["titulo"].lower())
-                        added_count += 1
-                        self.reporter.migrated_obras += 1
-                        
-                    except Exception as e:
-                        self.reporter.add_error(f"Erro ao converter obra: {e}", old_obra)
-                
-                # Salva scan se não for dry run
+                # Resultado do salvamento se não for dry run
                 if not dry_run:
-                    if self.save_scan_data(scan_name, scan_data):
+                    if save_results[scan_name]:
                         print(f"   ✅ {added_count} obras adicionadas ao arquivo {scan_name}.json")
                     else:
                         print(f"   ❌ Erro ao salvar {scan_name}.json")
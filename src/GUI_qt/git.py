@@ -1,18 +1,40 @@
 import os
-from dulwich import porcelain
+from functools import lru_cache
 from packaging import version
 from platformdirs import user_data_path
 
-data_path = user_data_path('py_web')
+REPO_URL = 'https://github.com/RochaSWallace/{name}'
 
-def update_providers():
-    if not os.path.isdir(data_path / 'py_web'):
-        porcelain.clone('https://github.com/RochaSWallace/py_web', data_path / 'py_web')
+@lru_cache(maxsize=None)
+def get_data_path():
+    return user_data_path('py_web')
+
+def update_providers(name='py_web'):
+    # dulwich.porcelain é pesado: importado só quando realmente usado
+    from dulwich import porcelain
+
+    repo_path = get_data_path() / name
+    if not os.path.isdir(repo_path):
+        porcelain.clone(REPO_URL.format(name=name), repo_path)
     else:
-        porcelain.pull(data_path / 'py_web')
+        porcelain.pull(repo_path)
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def get_last_version(name='py_web'):
+    # O mtime das refs de tags entra na chave do cache: enquanto nenhuma
+    # tag nova chegar, a versão vem do cache sem reler as refs do disco
+    git_dir = get_data_path() / name / '.git'
+    return _get_last_version(name, _mtime(git_dir / 'refs' / 'tags'), _mtime(git_dir / 'packed-refs'))
+
+@lru_cache(maxsize=1)
+def _get_last_version(name, tags_mtime, packed_refs_mtime):
+    from dulwich import porcelain
 
-def get_last_version():
-    tags = porcelain.tag_list(data_path / 'py_web')
+    tags = porcelain.tag_list(get_data_path() / name)
     versions_str = [v.decode('utf-8')[1:] for v in tags]
-    ordered_versions = sorted(versions_str, key=version.parse)
-    return ordered_versions[-1]
+    return max(versions_str, key=version.parse)
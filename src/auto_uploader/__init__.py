@@ -9,45 +9,35 @@ Módulos:
 --------
 - scheduler: AutoUpdateScheduler com timer inteligente
 - health_checker: Verificação de saúde da API
+- health_status: Enum de status de saúde (sem dependências externas)
 - scan_update_manager: Gerenciamento de updates por scan
 - update_models: Modelos de dados para updates
 - discord_notifier: Notificações via Discord
 """
 
+from importlib import import_module
+
 # Importações básicas que sempre existem
 from .scheduler import AutoUpdateScheduler, SchedulerConfig, get_scheduler
 from .queue import UnifiedQueue, QueueJob, QueuePriority, JobState, get_unified_queue
 
-# Importações condicionais para módulos que podem não existir ainda
-try:
-    from .health_checker import APIHealthChecker
-except ImportError:
-    APIHealthChecker = None
-
-try:
-    from .scan_update_manager import ScanUpdateManager
-except ImportError:
-    ScanUpdateManager = None
+# Importações condicionais para módulos que podem não existir ainda.
+# Carregadas sob demanda (PEP 562): importar o package não puxa aiohttp
+# e demais dependências desses módulos até o primeiro acesso ao nome.
+_LAZY_IMPORTS = {
+    'APIHealthChecker': '.health_checker',
+    'ScanUpdateManager': '.scan_update_manager',
+    'UpdateInfo': '.update_models',
+    'ScanUpdateResult': '.update_models',
+    'BatchUpdateResult': '.update_models',
+    'UpdateMethod': '.update_models',
+    'UpdateCacheEntry': '.update_models',
+    'ProviderCapabilities': '.update_models'
+}
 
-try:
-    from .update_models import (
-        UpdateInfo,
-        ScanUpdateResult, 
-        BatchUpdateResult,
-        UpdateMethod,
-        UpdateCacheEntry,
-        ProviderCapabilities
-    )
-except ImportError:
-    UpdateInfo = None
-    ScanUpdateResult = None
-    BatchUpdateResult = None
-    UpdateMethod = None
-    UpdateCacheEntry = None
-    ProviderCapabilities = None
 
-# Listar apenas módulos que foram importados com sucesso
-__all__ = [
+# Nomes sempre exportados (import direto acima)
+_BASE_ALL = (
     'AutoUpdateScheduler', 
     'SchedulerConfig', 
     'get_scheduler',
@@ -56,23 +46,37 @@ __all__ = [
     'QueuePriority', 
     'JobState',
     'get_unified_queue'
-]
+)
+
+
+def _load_lazy(name):
+    """Importa um nome de _LAZY_IMPORTS (None se o módulo não importar)"""
+    if name in globals():
+        return globals()[name]
+    
+    try:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    except ImportError:
+        value = None
+    
+    # Guarda no módulo: próximos acessos não passam por __getattr__
+    globals()[name] = value
+    return value
 
-if APIHealthChecker is not None:
-    __all__.append('APIHealthChecker')
 
-if ScanUpdateManager is not None:
-    __all__.append('ScanUpdateManager')
+def __getattr__(name):
+    if name == '__all__':
+        # Listar apenas nomes importados com sucesso. Calculado (uma vez) só
+        # no primeiro "from auto_uploader import *", que é quem consulta
+        # __all__: um import comum do package continua sem importá-los.
+        value = (*_BASE_ALL, *(lazy for lazy in _LAZY_IMPORTS if _load_lazy(lazy) is not None))
+        globals()['__all__'] = value
+        return value
+    
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _load_lazy(name)
 
-if UpdateInfo is not None:
-    __all__.extend([
-        'UpdateInfo',
-        'ScanUpdateResult', 
-        'BatchUpdateResult',
-        'UpdateMethod',
-        'UpdateCacheEntry',
-        'ProviderCapabilities'
-    ])
 
 __version__ = "2.0.0"
 __author__ = "MediocreToons Auto Uploader Team"
\ No newline at end of file
@@ -5,21 +5,98 @@ Este módulo implementa notificações no Discord quando APIs ficam offline
 ou retornam ao status online.
 """
 
-import sys
 import asyncio
-import aiohttp
+import time
+import aiofiles
 import logging
 import json
+import orjson
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple, Deque, TYPE_CHECKING
+from collections import deque
+from itertools import islice
+from urllib.parse import urlsplit
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
 
-# Adiciona o diretório src ao sys.path para imports
-sys.path.append(str(Path(__file__).parent.parent))
+# health_status não depende do aiohttp (health_checker depende)
+from .health_status import HealthStatus
 
-from auto_uploader.health_checker import HealthCheckResult, HealthStatus
+if TYPE_CHECKING:
+    # aiohttp é importado só ao abrir a primeira sessão (ver _get_session)
+    import aiohttp
+    from .health_checker import HealthCheckResult
+
+
+# Saída dos logs fica a cargo da aplicação (logging.basicConfig etc.)
+logging.getLogger("discord_notifier").addHandler(logging.NullHandler())
+
+# Notificações mantidas no histórico (memória e arquivo compactado)
+_HISTORY_MAXLEN = 500
+
+# Espera máxima (segundos) aceita do Retry-After de um 429
+_MAX_RETRY_AFTER = 60.0
+
+# Membros do enum ligados no módulo para as comparações por identidade nos laços
+_ONLINE = HealthStatus.ONLINE
+_DEGRADED = HealthStatus.DEGRADED
+
+# Tabelas estáticas dos embeds (construídas uma única vez)
+_STATUS_COLOR = {
+    HealthStatus.ONLINE: 0x00ff00,      # Verde
+    HealthStatus.DEGRADED: 0xffaa00,    # Laranja
+    HealthStatus.OFFLINE: 0xff0000,     # Vermelho
+    HealthStatus.UNKNOWN: 0x888888      # Cinza
+}
+
+_STATUS_EMOJI = {
+    HealthStatus.ONLINE: "✅",
+    HealthStatus.DEGRADED: "⚠️",
+    HealthStatus.OFFLINE: "❌",
+    HealthStatus.UNKNOWN: "❓"
+}
+
+# Título por tipo de notificação ({emoji} = emoji do status)
+_TITLE_BY_TYPE = {
+    "status_change": "{emoji} Mudança de Status - API",
+    "downtime_alert": "🚨 Alerta de Downtime - API",
+    "recovery": "🎉 API Recuperada",
+    "degraded": "⚠️ API com Performance Degradada"
+}
+
+# Modelos dos campos do embed de saúde; só "value" varia por notificação
+_BASE_FIELD_TEMPLATES = (
+    {"name": "🌐 URL", "inline": False},
+    {"name": "📊 Status", "inline": True},
+    {"name": "🔢 Código HTTP", "inline": True},
+    {"name": "⏱️ Tempo de Resposta", "inline": True},
+    {"name": "❗ Erro", "inline": False}
+)
+_PREVIOUS_STATUS_FIELD = {"name": "📈 Status Anterior", "inline": True}
+
+
+@lru_cache(maxsize=32)
+def _embed_header(status: HealthStatus, notification_type: str) -> Tuple[str, str, int, str]:
+    """Retorna (título, emoji, cor, status em maiúsculas) para o par status/tipo"""
+    emoji = _STATUS_EMOJI.get(status, "❓")
+    title = _TITLE_BY_TYPE.get(notification_type, "{emoji} Status da API").format(emoji=emoji)
+    return title, emoji, _STATUS_COLOR.get(status, 0x888888), status.value.upper()
+
+
+def _retry_after_seconds(header: Optional[str]) -> float:
+    """Espera pedida pelo Retry-After de um 429, limitada a _MAX_RETRY_AFTER"""
+    try:
+        return min(max(float(header), 0.0), _MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+@lru_cache(maxsize=256)
+def _truncate(text: str, limit: int) -> str:
+    """Corta o texto em limit caracteres (o mesmo erro se repete durante um downtime)"""
+    return text if len(text) <= limit else text[:limit]
 
 
 class NotificationLevel(Enum):
@@ -30,7 +107,7 @@ class NotificationLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscordWebhookConfig:
     """Configuração do webhook do Discord"""
     url: str
@@ -59,21 +136,33 @@ class DiscordNotifier:
         
         # Arquivos de configuração
         self.webhook_config_file = self.notifications_dir / "discord_config.json"
-        self.notification_history_file = self.notifications_dir / "notification_history.json"
+        self.notification_history_file = self.notifications_dir / "notification_history.jsonl"
+        self.legacy_history_file = self.notifications_dir / "notification_history.json"
         
         # Logger
         self.logger = logging.getLogger("discord_notifier")
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            self.logger.setLevel(logging.INFO)
         
         # Estado interno
         self._webhook_configs: Dict[str, DiscordWebhookConfig] = {}
-        self._notification_history: List[Dict[str, Any]] = []
-        self._last_notification_per_url: Dict[str, str] = {}  # URL -> timestamp da última notificação
+        self._notification_history: Deque[Dict[str, Any]] = deque(maxlen=_HISTORY_MAXLEN)
+        self._writes_since_compaction = 0  # Linhas acrescentadas ao JSONL desde a última reescrita
+        self._last_notification_per_url: Dict[str, float] = {}  # URL -> time.monotonic() da última notificação
+        self._netloc_cache: Dict[str, str] = {}  # URL -> host exibido no resumo
+        
+        # Sessão HTTP compartilhada entre envios (criada sob demanda)
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Escrita do histórico em segundo plano: entradas pendentes (dirty)
+        # gravadas por uma única tarefa, com debounce, sob um lock por loop
+        self._pending_history: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._save_lock: Optional[asyncio.Lock] = None
+        self._save_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Limita envios simultâneos no fan-out para os webhooks
+        self._send_sem: Optional[asyncio.Semaphore] = None
+        self._send_sem_loop: Optional[asyncio.AbstractEventLoop] = None
         
         self._load_webhook_configs()
         self._load_notification_history()
@@ -126,27 +215,139 @@ class DiscordNotifier:
         """Carrega histórico de notificações"""
         try:
             if self.notification_history_file.exists():
-                with open(self.notification_history_file, 'r', encoding='utf-8') as f:
-                    self._notification_history = json.load(f)
-                
-                # Manter apenas as últimas 500 notificações
-                if len(self._notification_history) > 500:
-                    self._notification_history = self._notification_history[-500:]
+                # O deque mantém apenas as últimas _HISTORY_MAXLEN notificações
+                lines = 0
+                with open(self.notification_history_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        lines += 1
+                        try:
+                            self._notification_history.append(orjson.loads(line))
+                        except orjson.JSONDecodeError:
+                            # Linha truncada por uma escrita interrompida
+                            self.logger.warning("Linha inválida ignorada no histórico de notificações")
+                # Um arquivo compactado tem no máximo _HISTORY_MAXLEN linhas;
+                # o excedente foi acrescentado depois da última compactação
+                self._writes_since_compaction = max(0, lines - _HISTORY_MAXLEN)
+            elif self.legacy_history_file.exists():
+                # Formato antigo (lista JSON única): converte para JSONL
+                with open(self.legacy_history_file, 'rb') as f:
+                    self._notification_history = deque(orjson.loads(f.read()), maxlen=_HISTORY_MAXLEN)
+                self._save_notification_history()
         except Exception as e:
             self.logger.error(f"Erro ao carregar histórico de notificações: {e}")
     
+    @staticmethod
+    def _encode_history_lines(entries) -> bytes:
+        """Serializa entradas do histórico como linhas JSONL"""
+        return b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+    
     def _save_notification_history(self) -> None:
-        """Salva histórico de notificações"""
+        """Reescreve (compacta) o histórico com as entradas em memória"""
         try:
-            # Limitar histórico antes de salvar
-            if len(self._notification_history) > 500:
-                self._notification_history = self._notification_history[-500:]
-            
-            with open(self.notification_history_file, 'w', encoding='utf-8') as f:
-                json.dump(self._notification_history, f, indent=2, ensure_ascii=False)
+            with open(self.notification_history_file, 'wb') as f:
+                f.write(self._encode_history_lines(self._notification_history))
+            self._writes_since_compaction = 0
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar histórico de notificações: {e}")
+    
+    async def _asave_notification_history(self) -> None:
+        """Reescreve (compacta) o histórico sem bloquear o event loop"""
+        try:
+            data = self._encode_history_lines(self._notification_history)
+            async with aiofiles.open(self.notification_history_file, 'wb') as f:
+                await f.write(data)
+            self._writes_since_compaction = 0
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar histórico de notificações: {e}")
+    
+    def _append_history_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """Acrescenta entradas ao final do histórico (append-only)"""
+        try:
+            with open(self.notification_history_file, 'ab') as f:
+                f.write(self._encode_history_lines(entries))
+            self._writes_since_compaction += len(entries)
         except Exception as e:
             self.logger.error(f"Erro ao salvar histórico de notificações: {e}")
     
+    async def _aappend_history_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """Acrescenta entradas ao final do histórico sem bloquear o event loop"""
+        try:
+            async with aiofiles.open(self.notification_history_file, 'ab') as f:
+                await f.write(self._encode_history_lines(entries))
+            self._writes_since_compaction += len(entries)
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar histórico de notificações: {e}")
+    
+    def _needs_compaction(self) -> bool:
+        """Mais de _HISTORY_MAXLEN linhas acrescentadas desde a última reescrita"""
+        return self._writes_since_compaction > _HISTORY_MAXLEN
+    
+    def _get_save_lock(self) -> asyncio.Lock:
+        """Obtém o lock de gravação do histórico do event loop atual"""
+        loop = asyncio.get_running_loop()
+        if self._save_lock is None or self._save_lock_loop is not loop:
+            self._save_lock = asyncio.Lock()
+            self._save_lock_loop = loop
+        return self._save_lock
+    
+    def _schedule_history_save(self, notification_data: Dict[str, Any]) -> None:
+        """
+        Marca uma entrada como pendente e agenda a gravação em segundo plano
+        
+        Fora de um event loop a gravação é feita na hora.
+        """
+        self._pending_history.append(notification_data)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending_history_sync()
+            return
+        
+        # Uma única tarefa por vez; as entradas seguintes entram no mesmo lote
+        if self._flush_task is None or self._flush_task.done() or self._flush_task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._flush_if_dirty())
+    
+    def _write_pending_history_sync(self) -> None:
+        """Grava as entradas pendentes de forma síncrona"""
+        if not self._pending_history:
+            return
+        
+        entries, self._pending_history = self._pending_history, []
+        self._append_history_entries(entries)
+        if self._needs_compaction():
+            self._save_notification_history()
+    
+    async def _write_pending_history(self) -> None:
+        """Grava as entradas pendentes (chamar com o lock de gravação)"""
+        if not self._pending_history:
+            return
+        
+        entries, self._pending_history = self._pending_history, []
+        await self._aappend_history_entries(entries)
+        if self._needs_compaction():
+            await self._asave_notification_history()
+    
+    async def _flush_if_dirty(self) -> None:
+        """Grava o histórico pendente; rajadas dentro do debounce viram uma escrita"""
+        try:
+            while self._pending_history:
+                await asyncio.sleep(0.5)
+                async with self._get_save_lock():
+                    await self._write_pending_history()
+        except asyncio.CancelledError:
+            # Loop encerrado sem close() (asyncio.run cancela as tarefas
+            # pendentes ao sair): o que ficou pendente é gravado na hora
+            self._write_pending_history_sync()
+            raise
+    
+    async def flush_history(self) -> None:
+        """Grava imediatamente todo o histórico pendente"""
+        async with self._get_save_lock():
+            await self._write_pending_history()
+    
     def add_webhook(self, name: str, url: str, username: str = "Health Monitor", 
                    avatar_url: str = None, enabled: bool = True) -> None:
         """
@@ -196,27 +397,23 @@ class DiscordNotifier:
             }
         return result
     
+    def _netloc(self, url: str) -> str:
+        """Obtém o host da URL para exibição (memoizado por URL)"""
+        netloc = self._netloc_cache.get(url)
+        if netloc is None:
+            netloc = urlsplit(url).netloc or url
+            self._netloc_cache[url] = netloc
+        return netloc
+    
     def _get_color_for_status(self, status: HealthStatus) -> int:
         """Obtém cor do embed baseada no status"""
-        color_map = {
-            HealthStatus.ONLINE: 0x00ff00,      # Verde
-            HealthStatus.DEGRADED: 0xffaa00,    # Laranja  
-            HealthStatus.OFFLINE: 0xff0000,     # Vermelho
-            HealthStatus.UNKNOWN: 0x888888      # Cinza
-        }
-        return color_map.get(status, 0x888888)
+        return _STATUS_COLOR.get(status, 0x888888)
     
     def _get_emoji_for_status(self, status: HealthStatus) -> str:
         """Obtém emoji para o status"""
-        emoji_map = {
-            HealthStatus.ONLINE: "✅",
-            HealthStatus.DEGRADED: "⚠️",
-            HealthStatus.OFFLINE: "❌",
-            HealthStatus.UNKNOWN: "❓"
-        }
-        return emoji_map.get(status, "❓")
+        return _STATUS_EMOJI.get(status, "❓")
     
-    def _create_health_embed(self, result: HealthCheckResult, 
+    def _create_health_embed(self, result: "HealthCheckResult", 
                            notification_type: str) -> Dict[str, Any]:
         """
         Cria embed do Discord para notificação de saúde
@@ -228,66 +425,93 @@ class DiscordNotifier:
         Returns:
             Dicionário do embed
         """
-        emoji = self._get_emoji_for_status(result.status)
-        color = self._get_color_for_status(result.status)
-        
-        # Título baseado no tipo de notificação
-        title_map = {
-            "status_change": f"{emoji} Mudança de Status - API",
-            "downtime_alert": "🚨 Alerta de Downtime - API",
-            "recovery": "🎉 API Recuperada",
-            "degraded": "⚠️ API com Performance Degradada"
-        }
-        
-        title = title_map.get(notification_type, f"{emoji} Status da API")
+        title, emoji, color, status_str = _embed_header(result.status, notification_type)
+        
+        # Valores na ordem de _BASE_FIELD_TEMPLATES; None = campo omitido
+        values = (
+            result.url,
+            f"{emoji} {status_str}",
+            str(result.status_code) if result.status_code else None,
+            f"{result.response_time_ms:.1f}ms" if result.response_time_ms is not None else None,
+            _truncate(result.error_message, 1000) if result.error_message else None  # Limitar tamanho
+        )
         
-        embed = {
+        return {
             "title": title,
             "color": color,
             "timestamp": result.timestamp,
             "fields": [
-                {
-                    "name": "🌐 URL",
-                    "value": result.url,
-                    "inline": False
-                },
-                {
-                    "name": "📊 Status",
-                    "value": f"{emoji} {result.status.value.upper()}",
-                    "inline": True
-                }
+                {**template, "value": value}
+                for template, value in zip(_BASE_FIELD_TEMPLATES, values)
+                if value is not None
             ]
         }
+    
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """
+        Obtém a sessão HTTP compartilhada, criando-a no primeiro uso
         
-        # Adicionar código de status se disponível
-        if result.status_code:
-            embed["fields"].append({
-                "name": "🔢 Código HTTP",
-                "value": str(result.status_code),
-                "inline": True
-            })
+        A sessão fica presa ao event loop em que foi criada; se o loop mudou
+        (ex.: run_async criando um loop novo), uma nova sessão é aberta.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            import aiohttp
+            
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+                headers={"Content-Type": "application/json"}
+            )
+            self._session_loop = loop
+        return self._session
+    
+    def _get_send_semaphore(self) -> asyncio.Semaphore:
+        """Obtém o semáforo de envios do event loop atual"""
+        loop = asyncio.get_running_loop()
+        if self._send_sem is None or self._send_sem_loop is not loop:
+            self._send_sem = asyncio.Semaphore(8)
+            self._send_sem_loop = loop
+        return self._send_sem
+    
+    async def close(self) -> None:
+        """Grava o histórico pendente e fecha a sessão HTTP compartilhada"""
+        await self.flush_history()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    async def __aenter__(self) -> "DiscordNotifier":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
+    @staticmethod
+    def _encode_payload(username: str, avatar_url: Optional[str],
+                        embeds: List[Dict[str, Any]], content: str = None) -> bytes:
+        """Serializa o corpo da mensagem do webhook"""
+        payload = {
+            "username": username,
+            "embeds": embeds
+        }
         
-        # Adicionar tempo de resposta se disponível
-        if result.response_time_ms is not None:
-            embed["fields"].append({
-                "name": "⏱️ Tempo de Resposta",
-                "value": f"{result.response_time_ms:.1f}ms",
-                "inline": True
-            })
+        if content:
+            payload["content"] = content
         
-        # Adicionar erro se houver
-        if result.error_message:
-            embed["fields"].append({
-                "name": "❗ Erro",
-                "value": result.error_message[:1000],  # Limitar tamanho
-                "inline": False
-            })
+        if avatar_url:
+            payload["avatar_url"] = avatar_url
         
-        return embed
+        return orjson.dumps(payload)
     
     async def _send_webhook_message(self, webhook_config: DiscordWebhookConfig, 
                                    embeds: List[Dict[str, Any]], 
-                                   content: str = None) -> bool:
+                                   content: str = None,
+                                   body: Optional[bytes] = None) -> bool:
         """
         Envia mensagem para webhook do Discord
         
@@ -295,6 +519,7 @@ class DiscordNotifier:
             webhook_config: Configuração do webhook
             embeds: Lista de embeds
             content: Conteúdo da mensagem (opcional)
+            body: Corpo já serializado, compartilhado entre webhooks (opcional)
             
         Returns:
             True se enviado com sucesso
@@ -302,35 +527,69 @@ class DiscordNotifier:
         if not webhook_config.enabled or not webhook_config.url:
             return False
         
-        payload = {
-            "username": webhook_config.username,
-            "embeds": embeds
-        }
-        
-        if content:
-            payload["content"] = content
-        
-        if webhook_config.avatar_url:
-            payload["avatar_url"] = webhook_config.avatar_url
+        if body is None:
+            body = self._encode_payload(webhook_config.username, webhook_config.avatar_url,
+                                        embeds, content)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    webhook_config.url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
+            session = await self._get_session()
+            for attempt in range(2):
+                # Serializado com orjson; o Content-Type JSON já vem da sessão
+                async with session.post(webhook_config.url, data=body) as response:
                     if response.status == 204:
                         return True
-                    else:
-                        self.logger.warning(f"Webhook retornou status {response.status}")
-                        return False
-                        
+                    if response.status == 429 and attempt == 0:
+                        # Rate limit do Discord: aguarda o reset indicado e tenta de novo
+                        retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                        self.logger.warning(f"Webhook limitado (429), nova tentativa em {retry_after:.1f}s")
+                        await asyncio.sleep(retry_after)
+                        continue
+                    self.logger.warning(f"Webhook retornou status {response.status}")
+                    return False
+            return False
+                    
         except Exception as e:
             self.logger.error(f"Erro ao enviar webhook: {e}")
             return False
     
-    async def notify_status_change(self, result: HealthCheckResult, 
+    async def _send_one(self, webhook_config: DiscordWebhookConfig,
+                        embeds: List[Dict[str, Any]],
+                        content: str = None,
+                        body: Optional[bytes] = None) -> bool:
+        """Envia para um webhook respeitando o limite de envios simultâneos"""
+        async with self._get_send_semaphore():
+            return await self._send_webhook_message(webhook_config, embeds, content, body)
+    
+    async def _broadcast(self, embeds: List[Dict[str, Any]],
+                         content: str = None) -> Tuple[int, int]:
+        """
+        Envia a mesma mensagem para todos os webhooks habilitados
+        
+        Args:
+            embeds: Lista de embeds
+            content: Conteúdo da mensagem (opcional)
+            
+        Returns:
+            Tupla (envios bem-sucedidos, webhooks habilitados)
+        """
+        enabled = [c for c in self._webhook_configs.values() if c.enabled]
+        if not enabled:
+            return 0, 0
+        
+        # Mesmo username/avatar em todos: serializa o corpo uma única vez
+        identities = {(c.username, c.avatar_url) for c in enabled}
+        shared_body = None
+        if len(identities) == 1:
+            username, avatar_url = identities.pop()
+            shared_body = self._encode_payload(username, avatar_url, embeds, content)
+        
+        results = await asyncio.gather(
+            *(self._send_one(c, embeds, content, shared_body) for c in enabled),
+            return_exceptions=True
+        )
+        return sum(1 for r in results if r is True), len(enabled)
+    
+    async def notify_status_change(self, result: "HealthCheckResult", 
                                  previous_status: Optional[HealthStatus] = None) -> None:
         """
         Notifica mudança de status
@@ -346,9 +605,9 @@ class DiscordNotifier:
         notification_type = "status_change"
         
         if previous_status:
-            if previous_status != HealthStatus.ONLINE and result.status == HealthStatus.ONLINE:
+            if previous_status is not _ONLINE and result.status is _ONLINE:
                 notification_type = "recovery"
-            elif result.status == HealthStatus.DEGRADED:
+            elif result.status is _DEGRADED:
                 notification_type = "degraded"
         
         embed = self._create_health_embed(result, notification_type)
@@ -357,24 +616,15 @@ class DiscordNotifier:
         if previous_status:
             previous_emoji = self._get_emoji_for_status(previous_status)
             embed["fields"].insert(1, {
-                "name": "📈 Status Anterior",
-                "value": f"{previous_emoji} {previous_status.value.upper()}",
-                "inline": True
+                **_PREVIOUS_STATUS_FIELD,
+                "value": f"{previous_emoji} {previous_status.value.upper()}"
             })
         
         # Enviar para todos os webhooks habilitados
-        tasks = []
-        for name, webhook_config in self._webhook_configs.items():
-            if webhook_config.enabled:
-                task = asyncio.create_task(
-                    self._send_webhook_message(webhook_config, [embed])
-                )
-                tasks.append(task)
-        
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            success_count = sum(1 for r in results if r is True)
-            self.logger.info(f"Notificação de mudança de status enviada para {success_count}/{len(tasks)} webhooks")
+        success_count, sent_count = await self._broadcast([embed])
+        
+        if sent_count:
+            self.logger.info(f"Notificação de mudança de status enviada para {success_count}/{sent_count} webhooks")
             
             # Registrar no histórico
             self._add_to_history({
@@ -403,13 +653,9 @@ class DiscordNotifier:
         last_notification_key = f"downtime_{url}"
         now = datetime.now(timezone.utc)
         
-        if last_notification_key in self._last_notification_per_url:
-            try:
-                last_time = datetime.fromisoformat(self._last_notification_per_url[last_notification_key])
-                if (now - last_time).total_seconds() < 1800:  # 30 minutos
-                    return
-            except Exception:
-                pass
+        last_time = self._last_notification_per_url.get(last_notification_key)
+        if last_time is not None and time.monotonic() - last_time < 1800:  # 30 minutos
+            return
         
         embed = {
             "title": "🚨 Alerta de Downtime Prolongado",
@@ -440,25 +686,16 @@ class DiscordNotifier:
         }
         
         # Enviar para todos os webhooks habilitados
-        tasks = []
-        for name, webhook_config in self._webhook_configs.items():
-            if webhook_config.enabled:
-                task = asyncio.create_task(
-                    self._send_webhook_message(
-                        webhook_config, 
-                        [embed],
-                        f"@here API {url} está offline há {downtime_minutes} minutos!"
-                    )
-                )
-                tasks.append(task)
-        
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            success_count = sum(1 for r in results if r is True)
-            self.logger.info(f"Alerta de downtime enviado para {success_count}/{len(tasks)} webhooks")
+        success_count, sent_count = await self._broadcast(
+            [embed],
+            f"@here API {url} está offline há {downtime_minutes} minutos!"
+        )
+        
+        if sent_count:
+            self.logger.info(f"Alerta de downtime enviado para {success_count}/{sent_count} webhooks")
             
             # Atualizar timestamp da última notificação
-            self._last_notification_per_url[last_notification_key] = now.isoformat()
+            self._last_notification_per_url[last_notification_key] = time.monotonic()
             
             # Registrar no histórico
             self._add_to_history({
@@ -470,7 +707,7 @@ class DiscordNotifier:
                 "webhooks_sent": success_count
             })
     
-    async def send_health_summary(self, results: Dict[str, HealthCheckResult]) -> None:
+    async def send_health_summary(self, results: Dict[str, "HealthCheckResult"]) -> None:
         """
         Envia resumo de saúde de múltiplas APIs
         
@@ -480,7 +717,25 @@ class DiscordNotifier:
         if not self._webhook_configs or not results:
             return
         
-        online_count = sum(1 for r in results.values() if r.is_healthy)
+        # Classificação e contagem em uma única passada pelos resultados
+        online_apis = []
+        offline_apis = []
+        degraded_apis = []
+        
+        for url, result in results.items():
+            api_name = self._netloc(url)
+            
+            if result.status is _ONLINE:
+                response_info = f" ({result.response_time_ms:.0f}ms)" if result.response_time_ms else ""
+                online_apis.append(f"✅ {api_name}{response_info}")
+            elif result.status is _DEGRADED:
+                response_info = f" ({result.response_time_ms:.0f}ms)" if result.response_time_ms else ""
+                degraded_apis.append(f"⚠️ {api_name}{response_info}")
+            else:
+                error_info = f" - {_truncate(result.error_message, 50)}..." if result.error_message else ""
+                offline_apis.append(f"❌ {api_name}{error_info}")
+        
+        online_count = len(online_apis)
         total_count = len(results)
         
         # Determinar cor baseada na proporção de APIs online
@@ -507,24 +762,6 @@ class DiscordNotifier:
             ]
         }
         
-        # Adicionar detalhes das APIs
-        online_apis = []
-        offline_apis = []
-        degraded_apis = []
-        
-        for url, result in results.items():
-            api_name = url.split("//")[1].split("/")[0] if "//" in url else url
-            
-            if result.status == HealthStatus.ONLINE:
-                response_info = f" ({result.response_time_ms:.0f}ms)" if result.response_time_ms else ""
-                online_apis.append(f"✅ {api_name}{response_info}")
-            elif result.status == HealthStatus.DEGRADED:
-                response_info = f" ({result.response_time_ms:.0f}ms)" if result.response_time_ms else ""
-                degraded_apis.append(f"⚠️ {api_name}{response_info}")
-            else:
-                error_info = f" - {result.error_message[:50]}..." if result.error_message else ""
-                offline_apis.append(f"❌ {api_name}{error_info}")
-        
         if online_apis:
             embed["fields"].append({
                 "name": f"✅ Online ({len(online_apis)})",
@@ -547,18 +784,10 @@ class DiscordNotifier:
             })
         
         # Enviar para todos os webhooks habilitados
-        tasks = []
-        for name, webhook_config in self._webhook_configs.items():
-            if webhook_config.enabled:
-                task = asyncio.create_task(
-                    self._send_webhook_message(webhook_config, [embed])
-                )
-                tasks.append(task)
-        
-        if tasks:
-            results_sent = await asyncio.gather(*tasks, return_exceptions=True)
-            success_count = sum(1 for r in results_sent if r is True)
-            self.logger.info(f"Resumo de saúde enviado para {success_count}/{len(tasks)} webhooks")
+        success_count, sent_count = await self._broadcast([embed])
+        
+        if sent_count:
+            self.logger.info(f"Resumo de saúde enviado para {success_count}/{sent_count} webhooks")
             
             # Registrar no histórico
             self._add_to_history({
@@ -571,13 +800,10 @@ class DiscordNotifier:
     
     def _add_to_history(self, notification_data: Dict[str, Any]) -> None:
         """Adiciona notificação ao histórico"""
+        # deque(maxlen=_HISTORY_MAXLEN) descarta as mais antigas automaticamente
         self._notification_history.append(notification_data)
         
-        # Manter apenas as últimas 500 notificações
-        if len(self._notification_history) > 500:
-            self._notification_history = self._notification_history[-500:]
-        
-        self._save_notification_history()
+        self._schedule_history_save(notification_data)
     
     def get_notification_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -589,7 +815,7 @@ class DiscordNotifier:
         Returns:
             Lista com histórico das notificações
         """
-        return list(reversed(self._notification_history[-limit:]))
+        return list(islice(reversed(self._notification_history), limit))
     
     async def test_webhook(self, name: str) -> bool:
         """
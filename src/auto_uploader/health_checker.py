@@ -8,43 +8,81 @@ estiver offline.
 
 import sys
 import asyncio
+import socket
 import aiohttp
 import logging
-import json
+import orjson
 import time
+import random
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Deque
 from dataclasses import dataclass, field, asdict
-from enum import Enum
+from collections import deque, defaultdict
+from itertools import islice
+from urllib.parse import urlsplit
 import math
 
 # Adiciona o diretório src ao sys.path para imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+# HealthStatus vive em um módulo sem dependências; reexportado aqui
+from .health_status import HealthStatus, STATUS_LOOKUP as _STATUS_LOOKUP
 
-class HealthStatus(Enum):
-    """Status de saúde da API"""
-    ONLINE = "online"
-    OFFLINE = "offline"
-    DEGRADED = "degraded"
-    UNKNOWN = "unknown"
 
+# Membros do enum ligados no módulo para as comparações por identidade nos laços
+_ONLINE = HealthStatus.ONLINE
+_OFFLINE = HealthStatus.OFFLINE
 
-@dataclass
+# (classe do código HTTP, acima do limite de degradação) -> status;
+# combinações ausentes (1xx, 3xx, 4xx, 5xx...) são OFFLINE
+_STATUS_TABLE = {
+    (2, False): HealthStatus.ONLINE,
+    (2, True): HealthStatus.DEGRADED,
+    **{(code_class, slow): HealthStatus.OFFLINE for code_class in (1, 3, 4, 5) for slow in (False, True)}
+}
+
+
+# Códigos 4xx que não mudam com retry (408 e 429 são transitórios)
+_PERMANENT_FAILURE_CODES = frozenset(range(400, 500)) - {408, 429}
+
+# Cabeçalho do GET usado quando o host não aceita HEAD
+_RANGE_FIRST_BYTE = {"Range": "bytes=0-0"}
+
+# Quantidade de horas mantidas nos contadores circulares de HealthMetrics
+_HOURLY_SLOTS = 24
+
+
+def _hourly_zeros() -> List[int]:
+    """Slots zerados para os contadores por hora"""
+    return [0] * _HOURLY_SLOTS
+
+
+@dataclass(slots=True, frozen=True)
 class HealthCheckResult:
-    """Resultado de uma verificação de health check"""
+    """Resultado de uma verificação de health check (imutável: é compartilhado
+    entre cache, histórico e índice por URL)"""
     url: str
     status: HealthStatus
     response_time_ms: Optional[float] = None
     status_code: Optional[int] = None
     error_message: Optional[str] = None
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    # Timestamp já convertido em datetime (evita fromisoformat a cada consulta)
+    _timestamp_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        try:
+            timestamp_dt = datetime.fromisoformat(self.timestamp)
+        except (TypeError, ValueError):
+            timestamp_dt = None
+        # Campo derivado: frozen exige object.__setattr__
+        object.__setattr__(self, '_timestamp_dt', timestamp_dt)
     
     @property
     def is_healthy(self) -> bool:
         """Retorna True se a API está saudável"""
-        return self.status == HealthStatus.ONLINE
+        return self.status is _ONLINE
     
     @property
     def response_time_seconds(self) -> Optional[float]:
@@ -54,7 +92,7 @@ class HealthCheckResult:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthMetrics:
     """Métricas de saúde da API"""
     total_checks: int = 0
@@ -66,6 +104,36 @@ class HealthMetrics:
     uptime_percentage: float = 100.0
     consecutive_failures: int = 0
     consecutive_successes: int = 0
+    # Contadores por hora em buffer circular (slot = hora_epoch % _HOURLY_SLOTS);
+    # hourly_hour guarda a hora epoch que ocupa cada slot (-1 = vazio)
+    hourly_hour: List[int] = field(default_factory=lambda: [-1] * _HOURLY_SLOTS, repr=False)
+    hourly_total: List[int] = field(default_factory=_hourly_zeros, repr=False)
+    hourly_success: List[int] = field(default_factory=_hourly_zeros, repr=False)
+    hourly_rt_sum: List[float] = field(default_factory=lambda: [0.0] * _HOURLY_SLOTS, repr=False)
+    hourly_rt_count: List[int] = field(default_factory=_hourly_zeros, repr=False)
+    # last_online/last_offline já convertidos em datetime (preenchidos sob demanda)
+    _last_online_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    _last_offline_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def last_online_dt(self) -> Optional[datetime]:
+        """Momento do último sucesso como datetime"""
+        if self._last_online_dt is None and self.last_online:
+            try:
+                self._last_online_dt = datetime.fromisoformat(self.last_online)
+            except ValueError:
+                return None
+        return self._last_online_dt
+    
+    @property
+    def last_offline_dt(self) -> Optional[datetime]:
+        """Momento da última falha como datetime"""
+        if self._last_offline_dt is None and self.last_offline:
+            try:
+                self._last_offline_dt = datetime.fromisoformat(self.last_offline)
+            except ValueError:
+                return None
+        return self._last_offline_dt
     
     @property
     def failure_rate(self) -> float:
@@ -74,6 +142,53 @@ class HealthMetrics:
             return 0.0
         return (self.failed_checks / self.total_checks) * 100
     
+    @property
+    def has_hourly_data(self) -> bool:
+        """True se algum slot dos contadores por hora está ocupado"""
+        return any(hour >= 0 for hour in self.hourly_hour)
+    
+    def add_to_hourly(self, result: HealthCheckResult) -> None:
+        """Acumula um resultado no slot da sua hora, zerando o slot na virada"""
+        if result._timestamp_dt is None:
+            return
+        hour = int(result._timestamp_dt.timestamp() // 3600)
+        slot = hour % _HOURLY_SLOTS
+        slot_hour = self.hourly_hour[slot]
+        if hour != slot_hour:
+            if hour < slot_hour:
+                # Mais antigo que a hora que já ocupa o slot: fora da janela
+                return
+            self.hourly_hour[slot] = hour
+            self.hourly_total[slot] = 0
+            self.hourly_success[slot] = 0
+            self.hourly_rt_sum[slot] = 0.0
+            self.hourly_rt_count[slot] = 0
+        
+        self.hourly_total[slot] += 1
+        if result.is_healthy:
+            self.hourly_success[slot] += 1
+        if result.response_time_ms is not None:
+            self.hourly_rt_sum[slot] += result.response_time_ms
+            self.hourly_rt_count[slot] += 1
+    
+    def hourly_summary(self, hours: int) -> Tuple[int, int, float, int]:
+        """
+        Soma os slots das últimas `hours` horas (incluindo a hora corrente)
+        
+        Returns:
+            (total, sucessos, soma dos tempos de resposta, qtd. de tempos)
+        """
+        first_hour = int(time.time() // 3600) - hours + 1
+        total = success = rt_count = 0
+        rt_sum = 0.0
+        for slot, hour in enumerate(self.hourly_hour):
+            if hour >= first_hour:
+                total += self.hourly_total[slot]
+                success += self.hourly_success[slot]
+                rt_sum += self.hourly_rt_sum[slot]
+                rt_count += self.hourly_rt_count[slot]
+        return total, success, rt_sum, rt_count
+    
     def update_from_result(self, result: HealthCheckResult) -> None:
         """Atualiza métricas com base em um resultado"""
         self.total_checks += 1
@@ -83,19 +198,19 @@ class HealthMetrics:
             self.consecutive_successes += 1
             self.consecutive_failures = 0
             self.last_online = result.timestamp
+            self._last_online_dt = result._timestamp_dt
             
-            # Atualizar tempo médio de resposta
+            # Atualizar tempo médio de resposta (média incremental das verificações bem-sucedidas)
             if result.response_time_ms is not None:
-                if self.avg_response_time_ms == 0:
-                    self.avg_response_time_ms = result.response_time_ms
-                else:
-                    # Média móvel simples
-                    self.avg_response_time_ms = (self.avg_response_time_ms + result.response_time_ms) / 2
+                self.avg_response_time_ms += (result.response_time_ms - self.avg_response_time_ms) / self.successful_checks
         else:
             self.failed_checks += 1
             self.consecutive_failures += 1
             self.consecutive_successes = 0
             self.last_offline = result.timestamp
+            self._last_offline_dt = result._timestamp_dt
+        
+        self.add_to_hourly(result)
         
         # Recalcular uptime
         if self.total_checks > 0:
@@ -105,16 +220,29 @@ class HealthMetrics:
 class APIHealthChecker:
     """
     Verificador de saúde da API com retry automático e cache
+    
+    Dentro de um event loop, métricas e histórico são gravados em lote a cada
+    flush_interval_seconds; o que ainda estiver pendente só vai para o disco
+    em aclose() (ou aflush()). Uso pontual deve fechar o checker:
+    
+        async with APIHealthChecker(data_dir) as checker:
+            await checker.check_health(url)
     """
     
-    def __init__(self, data_dir: Path = None):
+    def __init__(self, data_dir: Path = None, session: Optional[aiohttp.ClientSession] = None):
         """
         Inicializa o health checker
         
         Args:
             data_dir: Diretório de dados (opcional)
+            session: Sessão aiohttp externa reutilizada entre verificações
+                (opcional; sem ela o checker mantém a própria sessão com pool
+                de conexões, fechada em aclose())
         """
         self.data_dir = data_dir or Path("data")
+        self._session = session
+        self._owns_session = session is None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Diretórios
         self.health_dir = self.data_dir / "health"
@@ -122,7 +250,8 @@ class APIHealthChecker:
         
         # Arquivos de controle
         self.metrics_file = self.health_dir / "health_metrics.json"
-        self.history_file = self.health_dir / "health_history.json"
+        self.history_file = self.health_dir / "health_history.ndjson"
+        self.legacy_history_file = self.health_dir / "health_history.json"
         self.config_file = self.health_dir / "health_config.json"
         
         # Configurações padrão
@@ -130,10 +259,16 @@ class APIHealthChecker:
             "timeout_seconds": 10,
             "max_retries": 3,
             "retry_backoff_base": 2,
+            "retry_backoff_cap_seconds": 30,
             "cache_duration_minutes": 5,
             "notification_threshold_minutes": 60,
             "degraded_threshold_ms": 5000,
-            "max_history_entries": 1000
+            "max_history_entries": 1000,
+            "flush_interval_seconds": 30,
+            "max_concurrent_checks": 10,
+            "method": "HEAD",
+            "dns_cache_ttl_seconds": 600,
+            "force_ipv4": False
         }
         
         # Logger
@@ -147,19 +282,61 @@ class APIHealthChecker:
         
         # Estado interno
         self._config = self._load_config()
+        self._apply_config()
         self._metrics: Dict[str, HealthMetrics] = {}
-        self._history: List[HealthCheckResult] = []
+        # deque(maxlen) descarta as entradas mais antigas automaticamente
+        self._history: Deque[HealthCheckResult] = deque(maxlen=self._max_history_entries)
+        # Índice por URL: consultas de uma URL não varrem o histórico inteiro
+        self._history_by_url: Dict[str, Deque[HealthCheckResult]] = defaultdict(self._new_url_history)
         self._last_check_cache: Dict[str, HealthCheckResult] = {}
+        self._head_unsupported: set = set()  # Hosts que responderam 405/501 a HEAD
+        
+        # Histórico em NDJSON: uma linha acrescentada por verificação
+        self._history_fp = None
+        self._history_appends = 0  # Linhas acrescentadas desde a última compactação
+        
+        # Alterações ainda não gravadas (métricas e linhas do histórico);
+        # um único flusher grava tudo a cada flush_interval_seconds
+        self._metrics_dirty = False
+        self._pending_history_lines: List[bytes] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_write: Optional[asyncio.Future] = None
         
         self._load_metrics()
         self._load_history()
     
+    def _new_url_history(self) -> Deque[HealthCheckResult]:
+        """Cria o histórico limitado de uma URL no índice por URL"""
+        return deque(maxlen=self._max_history_entries)
+    
+    def _apply_config(self) -> None:
+        """
+        Copia a configuração para atributos
+        
+        Chamado ao carregar e ao atualizar a configuração, para que o caminho
+        de cada verificação não consulte o dicionário de configuração.
+        """
+        config = self._config
+        self._timeout = config.get("timeout_seconds", 10)
+        self._max_retries = config.get("max_retries", 3)
+        self._backoff_base = config.get("retry_backoff_base", 2)
+        self._backoff_cap = config.get("retry_backoff_cap_seconds", 30)
+        self._cache_duration = timedelta(minutes=config.get("cache_duration_minutes", 5))
+        self._notify_threshold_minutes = config.get("notification_threshold_minutes", 60)
+        self._degraded_ms = config.get("degraded_threshold_ms", 5000)
+        self._max_history_entries = config.get("max_history_entries", 1000)
+        self._flush_interval = config.get("flush_interval_seconds", 30)
+        self._max_concurrent_checks = max(1, config.get("max_concurrent_checks", 10))
+        self._method = config.get("method", "HEAD").upper()
+        self._dns_cache_ttl = config.get("dns_cache_ttl_seconds", 600)
+        self._force_ipv4 = config.get("force_ipv4", False)
+    
     def _load_config(self) -> Dict[str, Any]:
         """Carrega configurações do health checker"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    config = orjson.loads(f.read())
                 # Mesclar com configurações padrão
                 merged_config = self.default_config.copy()
                 merged_config.update(config)
@@ -175,8 +352,8 @@ class APIHealthChecker:
     def _save_config(self, config: Dict[str, Any]) -> None:
         """Salva configurações do health checker"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with open(self.config_file, 'wb') as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
         except Exception as e:
             self.logger.error(f"Erro ao salvar configurações: {e}")
     
@@ -184,8 +361,8 @@ class APIHealthChecker:
         """Carrega métricas de saúde"""
         try:
             if self.metrics_file.exists():
-                with open(self.metrics_file, 'r', encoding='utf-8') as f:
-                    metrics_data = json.load(f)
+                with open(self.metrics_file, 'rb') as f:
+                    metrics_data = orjson.loads(f.read())
                 
                 for url, data in metrics_data.items():
                     try:
@@ -195,79 +372,209 @@ class APIHealthChecker:
         except Exception as e:
             self.logger.error(f"Erro ao carregar métricas: {e}")
     
-    def _save_metrics(self) -> None:
+    def _metrics_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copia as métricas atuais para dicionários serializáveis"""
+        metrics_data = {}
+        for url, metrics in self._metrics.items():
+            data = asdict(metrics)
+            del data['_last_online_dt']
+            del data['_last_offline_dt']
+            metrics_data[url] = data
+        return metrics_data
+    
+    def _save_metrics_sync(self, metrics_data: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
         """Salva métricas de saúde"""
         try:
-            metrics_data = {}
-            for url, metrics in self._metrics.items():
-                metrics_data[url] = asdict(metrics)
+            if metrics_data is None:
+                metrics_data = self._metrics_snapshot()
             
-            with open(self.metrics_file, 'w', encoding='utf-8') as f:
-                json.dump(metrics_data, f, indent=2, ensure_ascii=False)
+            with open(self.metrics_file, 'wb') as f:
+                f.write(orjson.dumps(metrics_data, option=orjson.OPT_INDENT_2))
         except Exception as e:
             self.logger.error(f"Erro ao salvar métricas: {e}")
     
+    
+    def _load_history_entry(self, data: Dict[str, Any]) -> None:
+        """Converte uma entrada serializada e a adiciona ao histórico"""
+        try:
+            # Converter string de status de volta para enum
+            data['status'] = _STATUS_LOOKUP[data['status']]
+            self._history.append(HealthCheckResult(**data))
+        except Exception as e:
+            self.logger.warning(f"Erro ao carregar entrada do histórico: {e}")
+    
     def _load_history(self) -> None:
         """Carrega histórico de verificações"""
         try:
             if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history_data = json.load(f)
-                
-                for data in history_data:
-                    try:
-                        # Converter string de status de volta para enum
-                        if 'status' in data and isinstance(data['status'], str):
-                            data['status'] = HealthStatus(data['status'])
-                        result = HealthCheckResult(**data)
-                        self._history.append(result)
-                    except Exception as e:
-                        self.logger.warning(f"Erro ao carregar entrada do histórico: {e}")
-                        
-                # Manter apenas as últimas entradas
-                max_entries = self._config.get("max_history_entries", 1000)
-                if len(self._history) > max_entries:
-                    self._history = self._history[-max_entries:]
+                # Linha a linha direto para o deque (que descarta as antigas):
+                # nunca há mais de max_history_entries entradas em memória
+                with open(self.history_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            data = orjson.loads(line)
+                        except orjson.JSONDecodeError as e:
+                            # Linha truncada por uma escrita interrompida
+                            self.logger.warning(f"Erro ao carregar entrada do histórico: {e}")
+                            continue
+                        self._load_history_entry(data)
+                migrate_legacy = False
+            elif self.legacy_history_file.exists():
+                # Formato antigo (lista JSON única): convertido para NDJSON abaixo
+                with open(self.legacy_history_file, 'rb') as f:
+                    for data in orjson.loads(f.read()):
+                        self._load_history_entry(data)
+                migrate_legacy = True
+            else:
+                return
+            
+            for result in self._history:
+                self._history_by_url[result.url].append(result)
+            
+            # Métricas gravadas antes dos contadores por hora: reconstruí-los
+            # a partir do histórico carregado
+            for url, metrics in self._metrics.items():
+                if not metrics.has_hourly_data:
+                    for result in self._history_by_url.get(url, ()):
+                        metrics.add_to_hourly(result)
+            
+            if migrate_legacy:
+                self._save_history()
                     
         except Exception as e:
             self.logger.error(f"Erro ao carregar histórico: {e}")
     
-    def _save_history(self) -> None:
-        """Salva histórico de verificações"""
+    @staticmethod
+    def _history_line(result: HealthCheckResult) -> bytes:
+        """Serializa um resultado como uma linha NDJSON"""
+        result_dict = asdict(result)
+        del result_dict['_timestamp_dt']
+        # status (StrEnum) é serializado direto como string pelo orjson
+        return orjson.dumps(result_dict) + b"\n"
+    
+    def _close_history_file(self) -> None:
+        """Fecha o arquivo de histórico aberto para acréscimo"""
+        if self._history_fp is not None:
+            self._history_fp.close()
+            self._history_fp = None
+    
+    def _append_history_lines(self, lines: List[bytes]) -> None:
+        """Acrescenta linhas já serializadas ao final do histórico em disco"""
         try:
-            # Limitar histórico antes de salvar
-            max_entries = self._config.get("max_history_entries", 1000)
-            if len(self._history) > max_entries:
-                self._history = self._history[-max_entries:]
-            
-            history_data = []
-            for result in self._history:
-                result_dict = asdict(result)
-                # Converter enum para string para serialização JSON
-                if isinstance(result_dict.get('status'), HealthStatus):
-                    result_dict['status'] = result_dict['status'].value
-                history_data.append(result_dict)
-            
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, indent=2, ensure_ascii=False)
+            if self._history_fp is None:
+                # Aberto uma vez e reaproveitado entre flushes
+                self._history_fp = open(self.history_file, 'ab', buffering=0)
+            self._history_fp.write(b"".join(lines))
         except Exception as e:
             self.logger.error(f"Erro ao salvar histórico: {e}")
     
+    def _write_history_file(self, lines: List[bytes]) -> None:
+        """Reescreve o arquivo de histórico inteiro"""
+        try:
+            self._close_history_file()
+            with open(self.history_file, 'wb') as f:
+                f.writelines(lines)
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar histórico: {e}")
+    
+    def _append_history(self, result: HealthCheckResult) -> None:
+        """Enfileira um resultado para o próximo flush do histórico"""
+        self._pending_history_lines.append(self._history_line(result))
+        self._history_appends += 1
+        self._schedule_flush()
+    
+    def _compacted_history_lines(self) -> List[bytes]:
+        """Serializa o histórico em memória para reescrever o arquivo"""
+        # A reescrita já inclui as linhas pendentes
+        self._pending_history_lines = []
+        self._history_appends = 0
+        return [self._history_line(result) for result in self._history]
+    
+    def _save_history(self) -> None:
+        """Reescreve (compacta) o histórico com as entradas em memória"""
+        self._write_history_file(self._compacted_history_lines())
+    
     def _is_cache_valid(self, url: str) -> bool:
         """Verifica se o cache para uma URL ainda é válido"""
-        if url not in self._last_check_cache:
+        last_result = self._last_check_cache.get(url)
+        if last_result is None or last_result._timestamp_dt is None:
             return False
         
-        last_result = self._last_check_cache[url]
         try:
-            last_check = datetime.fromisoformat(last_result.timestamp.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            cache_duration = timedelta(minutes=self._config.get("cache_duration_minutes", 5))
-            
-            return (now - last_check) < cache_duration
-        except Exception:
+            return (datetime.now(timezone.utc) - last_result._timestamp_dt) < self._cache_duration
+        except TypeError:
+            # Timestamp sem fuso horário
             return False
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Obtém a sessão HTTP usada nas verificações, criando-a no primeiro uso
+        
+        A sessão própria fica presa ao event loop em que foi criada; se o loop
+        mudou (ex.: run_async criando um loop novo), uma nova sessão é aberta.
+        """
+        if not self._owns_session:
+            return self._session
+        
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=10,
+                    keepalive_timeout=60,
+                    # DNS resolvido uma vez por TTL, não a cada ciclo de verificação
+                    use_dns_cache=True,
+                    ttl_dns_cache=self._dns_cache_ttl,
+                    # Só IPv4 evita esperas de fallback em redes com IPv6 quebrado
+                    family=socket.AF_INET if self._force_ipv4 else 0
+                )
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def aclose(self) -> None:
+        """
+        Fecha o arquivo de histórico e a sessão HTTP própria
+        
+        Uma sessão externa fica a cargo de quem a criou.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        # Uma gravação já em andamento na thread termina antes do flush final
+        if self._flush_write is not None and not self._flush_write.done():
+            await self._flush_write
+        await self.aflush()
+        self._close_history_file()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._owns_session:
+            self._session = None
+            self._session_loop = None
+    
+    async def __aenter__(self) -> "APIHealthChecker":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    async def _probe(self, session: aiohttp.ClientSession, url: str, timeout: float,
+                     method: str, headers: Optional[Dict[str, str]] = None) -> Tuple[float, int]:
+        """
+        Faz uma requisição de verificação sem ler o corpo da resposta
+        
+        Returns:
+            Tupla (tempo de resposta em ms, código HTTP)
+        """
+        # Relógio monotônico: imune a ajustes do relógio do sistema (NTP)
+        start_ns = time.monotonic_ns()
+        async with session.request(method, url, headers=headers, allow_redirects=True,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return (time.monotonic_ns() - start_ns) / 1_000_000, response.status
+    
     async def _perform_health_check(self, url: str, timeout: float) -> HealthCheckResult:
         """
         Executa uma verificação de saúde
@@ -279,48 +586,48 @@ class APIHealthChecker:
         Returns:
             Resultado da verificação
         """
-        start_time = time.time()
+        response_time_ms = None
+        status_code = None
+        error_message = None
+        
+        # Sessão compartilhada mantém conexões (TCP+TLS) vivas entre verificações
+        session = await self._get_session()
+        
+        # HEAD dispensa o corpo da resposta; hosts que não aceitam HEAD
+        # recebem um GET pedindo só o primeiro byte
+        method = self._method
+        host = urlsplit(url).netloc
         
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as session:
-                async with session.get(url) as response:
-                    end_time = time.time()
-                    response_time_ms = (end_time - start_time) * 1000
-                    
-                    # Determinar status baseado no código de resposta e tempo
-                    if 200 <= response.status < 300:
-                        degraded_threshold = self._config.get("degraded_threshold_ms", 5000)
-                        if response_time_ms > degraded_threshold:
-                            status = HealthStatus.DEGRADED
-                        else:
-                            status = HealthStatus.ONLINE
-                    else:
-                        status = HealthStatus.OFFLINE
-                    
-                    return HealthCheckResult(
-                        url=url,
-                        status=status,
-                        response_time_ms=response_time_ms,
-                        status_code=response.status,
-                        timestamp=datetime.now(timezone.utc).isoformat()
-                    )
+            if method == "HEAD" and host in self._head_unsupported:
+                response_time_ms, status_code = await self._probe(session, url, timeout, "GET", _RANGE_FIRST_BYTE)
+            else:
+                response_time_ms, status_code = await self._probe(session, url, timeout, method)
+                if method == "HEAD" and status_code in (405, 501):
+                    self._head_unsupported.add(host)
+                    response_time_ms, status_code = await self._probe(session, url, timeout, "GET", _RANGE_FIRST_BYTE)
+            
+            # Determinar status baseado no código de resposta e tempo
+            status = _STATUS_TABLE.get(
+                (status_code // 100, response_time_ms > self._degraded_ms),
+                _OFFLINE
+            )
                     
         except asyncio.TimeoutError:
-            return HealthCheckResult(
-                url=url,
-                status=HealthStatus.OFFLINE,
-                error_message="Timeout na requisição",
-                timestamp=datetime.now(timezone.utc).isoformat()
-            )
+            status = _OFFLINE
+            error_message = "Timeout na requisição"
         except Exception as e:
-            return HealthCheckResult(
-                url=url,
-                status=HealthStatus.OFFLINE,
-                error_message=str(e),
-                timestamp=datetime.now(timezone.utc).isoformat()
-            )
+            status = _OFFLINE
+            error_message = str(e)
+        
+        return HealthCheckResult(
+            url=url,
+            status=status,
+            response_time_ms=response_time_ms,
+            status_code=status_code,
+            error_message=error_message,
+            timestamp=datetime.now(timezone.utc).isoformat()
+        )
     
     async def check_health(self, url: str, use_cache: bool = True) -> HealthCheckResult:
         """
@@ -339,9 +646,10 @@ class APIHealthChecker:
             self.logger.debug(f"Usando resultado em cache para {url}: {cached_result.status.value}")
             return cached_result
         
-        timeout = self._config.get("timeout_seconds", 10)
-        max_retries = self._config.get("max_retries", 3)
-        backoff_base = self._config.get("retry_backoff_base", 2)
+        timeout = self._timeout
+        max_retries = self._max_retries
+        backoff_base = self._backoff_base
+        backoff_cap = self._backoff_cap
         
         last_result = None
         
@@ -349,8 +657,8 @@ class APIHealthChecker:
             try:
                 result = await self._perform_health_check(url, timeout)
                 
-                if result.is_healthy or attempt == max_retries:
-                    # Sucesso ou última tentativa
+                if result.is_healthy or attempt == max_retries or result.status_code in _PERMANENT_FAILURE_CODES:
+                    # Sucesso, última tentativa ou erro que um retry não resolve
                     self._last_check_cache[url] = result
                     self._update_metrics(result)
                     self._add_to_history(result)
@@ -364,10 +672,11 @@ class APIHealthChecker:
                 
                 last_result = result
                 
-                # Backoff exponencial antes do próximo retry
+                # Backoff exponencial com jitter antes do próximo retry: URLs do
+                # mesmo servidor que falharam juntas não tentam de novo juntas
                 if attempt < max_retries:
-                    sleep_time = backoff_base ** attempt
-                    self.logger.debug(f"Tentativa {attempt + 1} falhou para {url}, tentando novamente em {sleep_time}s")
+                    sleep_time = random.uniform(0.5, 1.5) * min(backoff_cap, backoff_base ** attempt)
+                    self.logger.debug(f"Tentativa {attempt + 1} falhou para {url}, tentando novamente em {sleep_time:.1f}s")
                     await asyncio.sleep(sleep_time)
                     
             except Exception as e:
@@ -375,7 +684,7 @@ class APIHealthChecker:
                 if attempt == max_retries:
                     result = HealthCheckResult(
                         url=url,
-                        status=HealthStatus.OFFLINE,
+                        status=_OFFLINE,
                         error_message=f"Falha após {max_retries + 1} tentativas: {e}",
                         timestamp=datetime.now(timezone.utc).isoformat()
                     )
@@ -402,18 +711,83 @@ class APIHealthChecker:
             self._metrics[url] = HealthMetrics()
         
         self._metrics[url].update_from_result(result)
-        self._save_metrics()
+        self._metrics_dirty = True
+        self._schedule_flush()
+    
+    def _schedule_flush(self) -> None:
+        """
+        Agenda a gravação das métricas e do histórico pendentes
+        
+        Fora de um event loop a gravação é feita na hora.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self) -> None:
+        """Aguarda o intervalo de flush e grava o que mudou nele"""
+        await asyncio.sleep(self._flush_interval)
+        await self.aflush()
+    
+    def _take_pending(self) -> Tuple[Optional[Dict[str, Dict[str, Any]]], List[bytes], Optional[List[bytes]]]:
+        """
+        Retira as alterações pendentes para gravação
+        
+        Returns:
+            Tupla (snapshot das métricas ou None, linhas a acrescentar ao
+            histórico, linhas do histórico compactado ou None)
+        """
+        metrics_data = self._metrics_snapshot() if self._metrics_dirty else None
+        self._metrics_dirty = False
+        
+        # Compactar depois de max_history_entries acréscimos: o arquivo nunca
+        # passa do dobro do histórico mantido em memória
+        if self._history_appends >= self._max_history_entries:
+            return metrics_data, [], self._compacted_history_lines()
+        
+        lines, self._pending_history_lines = self._pending_history_lines, []
+        return metrics_data, lines, None
+    
+    def _write_pending(self, metrics_data: Optional[Dict[str, Dict[str, Any]]],
+                       history_lines: List[bytes],
+                       compacted_history: Optional[List[bytes]]) -> None:
+        """Grava em disco o que foi retirado por _take_pending"""
+        if metrics_data is not None:
+            self._save_metrics_sync(metrics_data)
+        
+        if compacted_history is not None:
+            self._write_history_file(compacted_history)
+        elif history_lines:
+            self._append_history_lines(history_lines)
+    
+    def flush(self) -> None:
+        """Grava imediatamente métricas e histórico pendentes"""
+        self._write_pending(*self._take_pending())
+    
+    async def aflush(self) -> None:
+        """Grava métricas e histórico pendentes em uma thread de I/O"""
+        metrics_data, history_lines, compacted_history = self._take_pending()
+        if metrics_data is None and not history_lines and compacted_history is None:
+            return
+        
+        # O snapshot é tirado no loop; só serialização e escrita vão para a
+        # thread. shield: cancelar o flusher não interrompe uma escrita já iniciada
+        self._flush_write = asyncio.ensure_future(
+            asyncio.to_thread(self._write_pending, metrics_data, history_lines, compacted_history)
+        )
+        await asyncio.shield(self._flush_write)
     
     def _add_to_history(self, result: HealthCheckResult) -> None:
         """Adiciona resultado ao histórico"""
         self._history.append(result)
-        
-        # Manter apenas as últimas entradas
-        max_entries = self._config.get("max_history_entries", 1000) 
-        if len(self._history) > max_entries:
-            self._history = self._history[-max_entries:]
-        
-        self._save_history()
+        self._history_by_url[result.url].append(result)
+        self._append_history(result)
     
     async def check_multiple_urls(self, urls: List[str], use_cache: bool = True) -> Dict[str, HealthCheckResult]:
         """
@@ -428,12 +802,15 @@ class APIHealthChecker:
         """
         self.logger.info(f"🔍 Verificando saúde de {len(urls)} APIs")
         
-        tasks = []
-        for url in urls:
-            task = asyncio.create_task(self.check_health(url, use_cache))
-            tasks.append(task)
+        # Limita verificações simultâneas: disparar todas de uma vez sobrecarrega
+        # DNS e servidores e gera falsos "offline" (que por sua vez geram retries)
+        semaphore = asyncio.Semaphore(self._max_concurrent_checks)
         
-        results = await asyncio.gather(*tasks)
+        async def bounded_check(url: str) -> HealthCheckResult:
+            async with semaphore:
+                return await self.check_health(url, use_cache)
+        
+        results = await asyncio.gather(*(bounded_check(url) for url in urls))
         
         result_dict = {}
         online_count = 0
@@ -453,6 +830,11 @@ class APIHealthChecker:
         """Obtém métricas para uma URL"""
         return self._metrics.get(url)
     
+    def get_metrics_bulk(self, urls: List[str]) -> Dict[str, HealthMetrics]:
+        """Obtém as métricas de várias URLs de uma vez (URLs sem métricas ficam de fora)"""
+        metrics = self._metrics
+        return {url: metrics[url] for url in urls if url in metrics}
+    
     def get_all_metrics(self) -> Dict[str, HealthMetrics]:
         """Obtém todas as métricas"""
         return self._metrics.copy()
@@ -468,13 +850,11 @@ class APIHealthChecker:
         Returns:
             Lista de resultados recentes
         """
-        history = self._history
-        
+        # Retornar os mais recentes primeiro
         if url:
-            history = [r for r in history if r.url == url]
+            return list(islice(reversed(self._history_by_url.get(url, ())), limit))
         
-        # Retornar os mais recentes primeiro
-        return list(reversed(history[-limit:]))
+        return list(islice(reversed(self._history), limit))
     
     def is_api_healthy(self, url: str) -> bool:
         """
@@ -504,7 +884,7 @@ class APIHealthChecker:
         if not metrics:
             return False
         
-        threshold_minutes = self._config.get("notification_threshold_minutes", 60)
+        threshold_minutes = self._notify_threshold_minutes
         
         # Se tem muitas falhas consecutivas e a última verificação foi offline
         if (metrics.consecutive_failures >= 3 and 
@@ -512,14 +892,15 @@ class APIHealthChecker:
             not self._last_check_cache[url].is_healthy):
             
             # Verificar se está offline há muito tempo
-            if metrics.last_offline:
+            last_offline = metrics.last_offline_dt
+            if last_offline is not None:
                 try:
-                    last_offline = datetime.fromisoformat(metrics.last_offline.replace('Z', '+00:00'))
                     now = datetime.now(timezone.utc)
                     downtime_minutes = (now - last_offline).total_seconds() / 60
                     
                     return downtime_minutes >= threshold_minutes
-                except Exception:
+                except TypeError:
+                    # Timestamp sem fuso horário
                     pass
         
         return False
@@ -536,6 +917,13 @@ class APIHealthChecker:
             new_config: Novas configurações
         """
         self._config.update(new_config)
+        self._apply_config()
+        
+        if self._history.maxlen != self._max_history_entries:
+            self._history = deque(self._history, maxlen=self._max_history_entries)
+            # O índice por URL segue o mesmo limite (e libera memória ao reduzi-lo)
+            for url, url_history in self._history_by_url.items():
+                self._history_by_url[url] = deque(url_history, maxlen=self._max_history_entries)
         self._save_config(self._config)
         self.logger.info("Configuração atualizada")
     
@@ -555,49 +943,88 @@ class APIHealthChecker:
         Returns:
             Resumo de uptime
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return self.get_uptime_summaries([url], (hours,))[url][hours]
+    
+    def get_uptime_summaries(self, urls: List[str],
+                             hours_list: Tuple[int, ...] = (24, 168)) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """
+        Obtém resumos de uptime de várias URLs e períodos de uma vez
         
-        # Filtrar histórico pelo período
-        relevant_history = []
-        for result in self._history:
-            if result.url == url:
-                try:
-                    result_time = datetime.fromisoformat(result.timestamp.replace('Z', '+00:00'))
-                    if result_time >= cutoff:
-                        relevant_history.append(result)
-                except Exception:
+        Períodos cobertos pelos contadores por hora são somados direto das
+        métricas; os demais saem de uma única passada pelo histórico.
+        
+        Args:
+            urls: URLs para analisar
+            hours_list: Períodos em horas para analisar
+            
+        Returns:
+            Resumos indexados por URL e depois por período
+        """
+        now = datetime.now(timezone.utc)
+        # Por URL: [total, online, soma dos tempos, qtd. de tempos, último timestamp]
+        totals: Dict[str, Dict[int, List[Any]]] = {}
+        # Por URL: períodos que precisam varrer o histórico, com o corte de cada um
+        scans: Dict[str, List[Tuple[int, datetime]]] = {}
+        
+        for url in urls:
+            metrics = self._metrics.get(url)
+            url_history = self._history_by_url.get(url)
+            url_totals = totals.setdefault(url, {})
+            for hours in hours_list:
+                if metrics is not None and hours <= _HOURLY_SLOTS and metrics.has_hourly_data:
+                    # Contadores por hora: soma de no máximo _HOURLY_SLOTS slots
+                    total, online, rt_sum, rt_count = metrics.hourly_summary(hours)
+                    last_check = url_history[-1].timestamp if url_history else None
+                    url_totals[hours] = [total, online, rt_sum, rt_count, last_check]
+                else:
+                    url_totals[hours] = [0, 0, 0.0, 0, None]
+                    scans.setdefault(url, []).append((hours, now - timedelta(hours=hours)))
+        
+        if scans:
+            for result in self._history:
+                windows = scans.get(result.url)
+                if windows is None or result._timestamp_dt is None:
                     continue
+                for hours, cutoff in windows:
+                    if result._timestamp_dt >= cutoff:
+                        acc = totals[result.url][hours]
+                        acc[0] += 1
+                        if result.is_healthy:
+                            acc[1] += 1
+                        if result.response_time_ms is not None:
+                            acc[2] += result.response_time_ms
+                            acc[3] += 1
+                        acc[4] = result.timestamp
         
-        if not relevant_history:
-            return {
-                "url": url,
-                "period_hours": hours,
-                "total_checks": 0,
-                "uptime_percentage": 0.0,
-                "avg_response_time_ms": 0.0,
-                "status": "no_data"
-            }
-        
-        online_checks = sum(1 for r in relevant_history if r.is_healthy)
-        total_checks = len(relevant_history)
-        uptime_percentage = (online_checks / total_checks) * 100 if total_checks > 0 else 0
-        
-        # Calcular tempo médio de resposta
-        response_times = [r.response_time_ms for r in relevant_history if r.response_time_ms is not None]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        # Status atual
-        current_status = "unknown"
-        if url in self._last_check_cache:
-            current_status = self._last_check_cache[url].status.value
-        
-        return {
-            "url": url,
-            "period_hours": hours,
-            "total_checks": total_checks,
-            "online_checks": online_checks,
-            "uptime_percentage": round(uptime_percentage, 2),
-            "avg_response_time_ms": round(avg_response_time, 2),
-            "current_status": current_status,
-            "last_check": relevant_history[-1].timestamp if relevant_history else None
-        }
\ No newline at end of file
+        summaries: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        for url, url_totals in totals.items():
+            # Status atual
+            current_status = "unknown"
+            if url in self._last_check_cache:
+                current_status = self._last_check_cache[url].status
+            
+            url_summaries = summaries[url] = {}
+            for hours, (total_checks, online_checks, rt_sum, rt_count, last_check) in url_totals.items():
+                if total_checks == 0:
+                    url_summaries[hours] = {
+                        "url": url,
+                        "period_hours": hours,
+                        "total_checks": 0,
+                        "uptime_percentage": 0.0,
+                        "avg_response_time_ms": 0.0,
+                        "status": "no_data"
+                    }
+                    continue
+                
+                url_summaries[hours] = {
+                    "url": url,
+                    "period_hours": hours,
+                    "total_checks": total_checks,
+                    "online_checks": online_checks,
+                    "uptime_percentage": round((online_checks / total_checks) * 100, 2),
+                    "avg_response_time_ms": round(rt_sum / rt_count if rt_count else 0, 2),
+                    "current_status": current_status,
+                    "last_check": last_check
+                }
+        
+        return summaries
\ No newline at end of file
@@ -7,10 +7,12 @@ auto-updates, verificando a saúde das APIs antes de iniciar ciclos.
 
 import sys
 import asyncio
+import hashlib
 import logging
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 # Adiciona o diretório src ao sys.path para imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -18,6 +20,28 @@ sys.path.append(str(Path(__file__).parent.parent))
 from auto_uploader.health_checker import APIHealthChecker, HealthCheckResult, HealthStatus
 from auto_uploader.discord_notifier import DiscordNotifier
 
+# Dados do dashboard mudam na cadência dos health checks (minutos); entre
+# uma verificação e outra a mesma resposta é reaproveitada por alguns segundos
+_DASHBOARD_CACHE_TTL = 10.0
+_DASHBOARD_CACHE_MAXSIZE = 32
+
+# Token bucket das notificações do Discord: rajada de até 5 envios,
+# repostos à taxa de 5 a cada 2 segundos
+_NOTIFY_BUCKET_CAPACITY = 5
+_NOTIFY_BUCKET_INTERVAL = 2.0
+
+# Estado por URL (status anterior, flag de downtime) de URLs que deixaram de
+# ser verificadas é descartado após 7 dias; no máximo 10 000 URLs
+_STATUS_STATE_TTL = 7 * 86400
+_STATUS_STATE_MAXSIZE = 10_000
+
+# Espera máxima por notificações pendentes ao fechar o manager
+_NOTIFY_DRAIN_TIMEOUT = 10.0
+
+# Membros do enum ligados no módulo para as comparações por identidade nos laços
+_ONLINE = HealthStatus.ONLINE
+_DEGRADED = HealthStatus.DEGRADED
+
 
 class HealthIntegrationManager:
     """
@@ -49,6 +73,135 @@ class HealthIntegrationManager:
         # Estado interno
         self._previous_statuses: Dict[str, HealthStatus] = {}
         self._notification_sent_for_downtime: Dict[str, bool] = {}
+        # Última vez (time.monotonic) que cada URL foi processada, da mais antiga
+        # para a mais recente; limita o crescimento dos dois dicts acima
+        self._status_seen_at: Dict[str, float] = {}
+        
+        # Cache do dashboard: tupla ordenada de URLs -> (expira_em, dados)
+        self._dashboard_cache: Dict[Tuple[str, ...], Tuple[float, Dict[str, Any]]] = {}
+        # Nome exibido de cada URL (host), calculado uma vez por URL
+        self._url_names: Dict[str, str] = {}
+        
+        # Fila de notificações do Discord: (tipo, url) -> argumentos mais recentes;
+        # a fila guarda só as chaves e um worker as envia respeitando o token bucket
+        self._pending_notifications: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+        self._notify_queue: Optional[asyncio.Queue] = None
+        self._notify_worker: Optional[asyncio.Task] = None
+        self._notify_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Event loop persistente em que as corrotinas são executadas quando o
+        # manager é usado a partir de código síncrono (ver health_routes)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Monitoramento contínuo agendado nesse loop (concurrent.futures.Future)
+        self._monitor_task = None
+    
+    async def aclose(self) -> None:
+        """
+        Grava o que estiver pendente e fecha as sessões HTTP dos componentes
+        
+        O health checker e o notificador mantêm cada um uma sessão aiohttp com
+        pool de conexões keep-alive reaproveitada entre os ciclos; ela só é
+        fechada aqui.
+        """
+        await self._drain_notifications()
+        try:
+            await self.health_checker.aclose()
+        finally:
+            await self.discord_notifier.close()
+    
+    def _enqueue_notification(self, kind: str, url: str, args: Tuple[Any, ...]) -> None:
+        """
+        Agenda uma notificação do Discord sem bloquear o ciclo de verificação
+        
+        Notificações do mesmo tipo para a mesma URL ainda não enviadas são
+        agrupadas: fica valendo a mais recente. Uma mudança de status que volta
+        ao status original antes do envio é descartada.
+        
+        Args:
+            kind: "status_change" ou "downtime_alert"
+            url: URL da API
+            args: Argumentos do método correspondente do notificador
+        """
+        queue = self._get_notify_queue()
+        key = (kind, url)
+        pending = self._pending_notifications.get(key)
+        
+        if pending is None:
+            self._pending_notifications[key] = args
+            queue.put_nowait(key)
+        elif kind == "status_change":
+            result, _ = args
+            original_previous = pending[1]
+            if result.status is original_previous:
+                del self._pending_notifications[key]
+            else:
+                self._pending_notifications[key] = (result, original_previous)
+        else:
+            self._pending_notifications[key] = args
+    
+    def _get_notify_queue(self) -> asyncio.Queue:
+        """Obtém a fila de notificações do event loop atual, iniciando o worker"""
+        loop = asyncio.get_running_loop()
+        if self._notify_queue is None or self._notify_loop is not loop:
+            # Chaves pendentes de outro loop nunca seriam consumidas
+            self._pending_notifications.clear()
+            self._notify_queue = asyncio.Queue()
+            self._notify_loop = loop
+            self._notify_worker = loop.create_task(self._notification_worker(self._notify_queue))
+        return self._notify_queue
+    
+    async def _notification_worker(self, queue: asyncio.Queue) -> None:
+        """Envia as notificações da fila, no máximo no ritmo do token bucket"""
+        loop = asyncio.get_running_loop()
+        rate = _NOTIFY_BUCKET_CAPACITY / _NOTIFY_BUCKET_INTERVAL
+        tokens = float(_NOTIFY_BUCKET_CAPACITY)
+        last_refill = loop.time()
+        
+        while True:
+            kind, url = key = await queue.get()
+            try:
+                now = loop.time()
+                tokens = min(_NOTIFY_BUCKET_CAPACITY, tokens + (now - last_refill) * rate)
+                last_refill = now
+                if tokens < 1:
+                    await asyncio.sleep((1 - tokens) / rate)
+                    tokens = 1.0
+                    last_refill = loop.time()
+                
+                # Lido só agora: agrupa o que chegou enquanto aguardava o token
+                args = self._pending_notifications.pop(key, None)
+                if args is None:
+                    continue
+                tokens -= 1
+                
+                if kind == "status_change":
+                    await self.discord_notifier.notify_status_change(*args)
+                else:
+                    await self.discord_notifier.notify_downtime_alert(*args)
+            except Exception as e:
+                self.logger.error("Erro ao enviar notificação %s para %s: %s", kind, url, e)
+            finally:
+                queue.task_done()
+    
+    async def _drain_notifications(self) -> None:
+        """Aguarda (por tempo limitado) as notificações pendentes e para o worker"""
+        worker = self._notify_worker
+        if worker is None or self._notify_loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(self._notify_queue.join(), _NOTIFY_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.warning("Notificações pendentes descartadas ao encerrar")
+        worker.cancel()
+        self._notify_worker = None
+        self._notify_queue = None
+        self._notify_loop = None
+    
+    async def __aenter__(self) -> "HealthIntegrationManager":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
     
     async def check_apis_before_update(self, provider_urls: List[str], 
                                      min_healthy_percentage: float = 0.7) -> Dict[str, Any]:
@@ -62,32 +215,33 @@ class HealthIntegrationManager:
         Returns:
             Dicionário com resultado da verificação
         """
-        self.logger.info(f"🔍 Verificando saúde de {len(provider_urls)} providers antes do auto-update")
+        self.logger.info("🔍 Verificando saúde de %d providers antes do auto-update", len(provider_urls))
         
         # Executar health checks
         results = await self.health_checker.check_multiple_urls(provider_urls, use_cache=True)
         
-        # Analisar resultados
-        total_apis = len(results)
-        healthy_apis = sum(1 for r in results.values() if r.is_healthy)
-        healthy_percentage = (healthy_apis / total_apis) * 100 if total_apis > 0 else 0
-        
-        # Determinar se pode prosseguir
-        can_proceed = healthy_percentage >= (min_healthy_percentage * 100)
-        
-        # Categorizar APIs
+        # Categorizar APIs (uma única passada pelos resultados)
         online_apis = []
         offline_apis = []
         degraded_apis = []
         
         for url, result in results.items():
-            if result.status == HealthStatus.ONLINE:
+            status = result.status
+            if status is _ONLINE:
                 online_apis.append(url)
-            elif result.status == HealthStatus.DEGRADED:
+            elif status is _DEGRADED:
                 degraded_apis.append(url)
             else:
                 offline_apis.append(url)
         
+        # Analisar resultados (saudável = ONLINE, como em is_healthy)
+        total_apis = len(results)
+        healthy_apis = len(online_apis)
+        healthy_percentage = (healthy_apis / total_apis) * 100 if total_apis > 0 else 0
+        
+        # Determinar se pode prosseguir
+        can_proceed = healthy_percentage >= (min_healthy_percentage * 100)
+        
         summary = {
             "can_proceed": can_proceed,
             "total_apis": total_apis,
@@ -103,9 +257,11 @@ class HealthIntegrationManager:
         
         # Log do resultado
         if can_proceed:
-            self.logger.info(f"✅ Auto-update pode prosseguir: {healthy_apis}/{total_apis} APIs saudáveis ({healthy_percentage:.1f}%)")
+            self.logger.info("✅ Auto-update pode prosseguir: %d/%d APIs saudáveis (%.1f%%)",
+                             healthy_apis, total_apis, healthy_percentage)
         else:
-            self.logger.warning(f"❌ Auto-update bloqueado: apenas {healthy_apis}/{total_apis} APIs saudáveis ({healthy_percentage:.1f}% < {min_healthy_percentage * 100:.1f}%)")
+            self.logger.warning("❌ Auto-update bloqueado: apenas %d/%d APIs saudáveis (%.1f%% < %.1f%%)",
+                                healthy_apis, total_apis, healthy_percentage, min_healthy_percentage * 100)
         
         # Processar mudanças de status e notificações
         await self._process_status_changes(results)
@@ -114,61 +270,85 @@ class HealthIntegrationManager:
     
     async def _process_status_changes(self, results: Dict[str, HealthCheckResult]) -> None:
         """
-        Processa mudanças de status e envia notificações
+        Processa mudanças de status e agenda as notificações
         
         Args:
             results: Resultados dos health checks
         """
+        # Resultados novos: o dashboard em cache ficou desatualizado
+        self.clear_dashboard_cache()
+        
+        prev_map = self._previous_statuses
+        notif_map = self._notification_sent_for_downtime
+        seen_at = self._status_seen_at
+        seen_now = time.monotonic()
+        
         for url, result in results.items():
+            # Reinserir move a URL para o fim (mais recente)
+            seen_at.pop(url, None)
+            seen_at[url] = seen_now
+            
             current_status = result.status
-            previous_status = self._previous_statuses.get(url)
+            previous_status = prev_map.get(url)
+            # Atualizar status anterior
+            prev_map[url] = current_status
             
             # Verificar mudança de status
-            if previous_status and previous_status != current_status:
-                self.logger.info(f"🔄 Mudança de status para {url}: {previous_status.value} → {current_status.value}")
+            if previous_status is not None and previous_status is not current_status:
+                self.logger.info("🔄 Mudança de status para %s: %s → %s", url, previous_status.value, current_status.value)
                 
-                # Notificar mudança de status
-                try:
-                    await self.discord_notifier.notify_status_change(result, previous_status)
-                except Exception as e:
-                    self.logger.error(f"Erro ao notificar mudança de status para {url}: {e}")
+                # Notificar mudança de status (enviada em segundo plano)
+                self._enqueue_notification("status_change", url, (result, previous_status))
             
-            # Verificar se precisa notificar downtime prolongado
-            if (not result.is_healthy and 
-                self.health_checker.should_notify_downtime(url) and
-                not self._notification_sent_for_downtime.get(url, False)):
-                
-                try:
-                    metrics = self.health_checker.get_metrics(url)
-                    if metrics:
-                        # Calcular tempo de downtime
-                        downtime_minutes = 0
-                        if metrics.last_offline:
-                            try:
-                                last_offline = datetime.fromisoformat(metrics.last_offline.replace('Z', '+00:00'))
-                                now = datetime.now(timezone.utc)
-                                downtime_minutes = int((now - last_offline).total_seconds() / 60)
-                            except Exception:
-                                pass
-                        
-                        await self.discord_notifier.notify_downtime_alert(
-                            url, 
-                            downtime_minutes, 
-                            metrics.consecutive_failures
-                        )
-                        
-                        # Marcar como notificado para evitar spam
-                        self._notification_sent_for_downtime[url] = True
-                        
-                except Exception as e:
-                    self.logger.error(f"Erro ao notificar downtime para {url}: {e}")
+            if result.is_healthy:
+                # A API voltou ao normal: limpar flag de notificação
+                notif_map.pop(url, None)
+                continue
             
-            # Se a API voltou ao normal, limpar flag de notificação
-            if result.is_healthy and url in self._notification_sent_for_downtime:
-                del self._notification_sent_for_downtime[url]
+            # Verificar se precisa notificar downtime prolongado
+            if notif_map.get(url, False) or not self.health_checker.should_notify_downtime(url):
+                continue
             
-            # Atualizar status anterior
-            self._previous_statuses[url] = current_status
+            try:
+                metrics = self.health_checker.get_metrics(url)
+                if metrics:
+                    # Calcular tempo de downtime (datetime já convertido nas métricas)
+                    downtime_minutes = 0
+                    last_offline = metrics.last_offline_dt
+                    if last_offline is not None:
+                        try:
+                            now = datetime.now(timezone.utc)
+                            downtime_minutes = int((now - last_offline).total_seconds() / 60)
+                        except TypeError:
+                            # Timestamp sem fuso horário
+                            pass
+                    
+                    # Alerta enviado em segundo plano
+                    self._enqueue_notification(
+                        "downtime_alert",
+                        url,
+                        (url, downtime_minutes, metrics.consecutive_failures)
+                    )
+                    
+                    # Marcar como notificado para evitar spam
+                    notif_map[url] = True
+                    
+            except Exception as e:
+                self.logger.error("Erro ao notificar downtime para %s: %s", url, e)
+        
+        self._prune_status_state(seen_now)
+    
+    def _prune_status_state(self, now: float) -> None:
+        """Descarta o estado das URLs não vistas há _STATUS_STATE_TTL ou além do limite"""
+        seen_at = self._status_seen_at
+        expire_before = now - _STATUS_STATE_TTL
+        while seen_at:
+            url, last_seen = next(iter(seen_at.items()))
+            if last_seen >= expire_before and len(seen_at) <= _STATUS_STATE_MAXSIZE:
+                break
+            del seen_at[url]
+            self._previous_statuses.pop(url, None)
+            self._notification_sent_for_downtime.pop(url, None)
     
     async def get_provider_health_report(self, provider_urls: List[str]) -> Dict[str, Any]:
         """
@@ -185,19 +365,29 @@ class HealthIntegrationManager:
         # Verificar saúde atual
         current_results = await self.health_checker.check_multiple_urls(provider_urls, use_cache=False)
         
-        # Coletar métricas e resumos de uptime
+        # Coletar métricas e resumos de uptime (24h e 7 dias em uma só passada)
         provider_reports = {}
+        uptime_summaries = self.health_checker.get_uptime_summaries(provider_urls, (24, 168))
+        all_metrics = self.health_checker.get_metrics_bulk(provider_urls)
+        overall_uptime_24h = []
+        overall_uptime_7d = []
         
         for url in provider_urls:
-            metrics = self.health_checker.get_metrics(url)
-            uptime_24h = self.health_checker.get_uptime_summary(url, hours=24)
-            uptime_7d = self.health_checker.get_uptime_summary(url, hours=168)  # 7 dias
+            metrics = all_metrics.get(url)
+            uptime_24h = uptime_summaries[url][24]
+            uptime_7d = uptime_summaries[url][168]
+            
+            if uptime_24h["total_checks"] > 0:
+                overall_uptime_24h.append(uptime_24h["uptime_percentage"])
+            if uptime_7d["total_checks"] > 0:
+                overall_uptime_7d.append(uptime_7d["uptime_percentage"])
+            
             recent_history = self.health_checker.get_recent_history(url, limit=20)
             
             current_result = current_results.get(url)
             
             provider_reports[url] = {
-                "current_status": current_result.status.value if current_result else "unknown",
+                "current_status": current_result.status if current_result else "unknown",
                 "current_response_time_ms": current_result.response_time_ms if current_result else None,
                 "last_error": current_result.error_message if current_result and current_result.error_message else None,
                 "metrics": {
@@ -213,7 +403,7 @@ class HealthIntegrationManager:
                 "recent_history": [
                     {
                         "timestamp": h.timestamp,
-                        "status": h.status.value,
+                        "status": h.status,
                         "response_time_ms": h.response_time_ms,
                         "error": h.error_message
                     }
@@ -225,18 +415,6 @@ class HealthIntegrationManager:
         total_providers = len(provider_urls)
         online_providers = sum(1 for r in current_results.values() if r.is_healthy)
         
-        overall_uptime_24h = []
-        overall_uptime_7d = []
-        
-        for url in provider_urls:
-            uptime_24h = self.health_checker.get_uptime_summary(url, hours=24)
-            uptime_7d = self.health_checker.get_uptime_summary(url, hours=168)
-            
-            if uptime_24h["total_checks"] > 0:
-                overall_uptime_24h.append(uptime_24h["uptime_percentage"])
-            if uptime_7d["total_checks"] > 0:
-                overall_uptime_7d.append(uptime_7d["uptime_percentage"])
-        
         avg_uptime_24h = sum(overall_uptime_24h) / len(overall_uptime_24h) if overall_uptime_24h else 0
         avg_uptime_7d = sum(overall_uptime_7d) / len(overall_uptime_7d) if overall_uptime_7d else 0
         
@@ -265,13 +443,21 @@ class HealthIntegrationManager:
             check_interval_minutes: Intervalo entre verificações em minutos
             summary_interval_hours: Intervalo para envio de resumos em horas
         """
-        self.logger.info(f"🔄 Iniciando monitoramento contínuo de {len(provider_urls)} providers")
-        self.logger.info(f"   • Verificações a cada {check_interval_minutes} minutos")
-        self.logger.info(f"   • Resumos a cada {summary_interval_hours} horas")
-        
-        last_summary_time = datetime.now(timezone.utc)
+        self.logger.info("🔄 Iniciando monitoramento contínuo de %d providers", len(provider_urls))
+        self.logger.info("   • Verificações a cada %s minutos", check_interval_minutes)
+        self.logger.info("   • Resumos a cada %s horas", summary_interval_hours)
+        
+        # Cadência medida no relógio monotônico do loop (imune a ajustes do relógio de parede)
+        loop = asyncio.get_running_loop()
+        check_interval = check_interval_minutes * 60
+        summary_interval = summary_interval_hours * 3600
+        next_summary_at = loop.time() + summary_interval
+        # Início do próximo ciclo: o tempo gasto verificando sai da espera,
+        # então os ciclos não vão se atrasando
+        next_tick = loop.time()
         
         while True:
+            next_tick += check_interval
             try:
                 # Executar verificações de saúde
                 results = await self.health_checker.check_multiple_urls(provider_urls, use_cache=False)
@@ -280,60 +466,117 @@ class HealthIntegrationManager:
                 await self._process_status_changes(results)
                 
                 # Verificar se é hora de enviar resumo
-                now = datetime.now(timezone.utc)
-                time_since_summary = (now - last_summary_time).total_seconds() / 3600
-                
-                if time_since_summary >= summary_interval_hours:
+                now = loop.time()
+                if now >= next_summary_at:
                     try:
                         await self.discord_notifier.send_health_summary(results)
-                        last_summary_time = now
+                        next_summary_at = now + summary_interval
                     except Exception as e:
-                        self.logger.error(f"Erro ao enviar resumo de saúde: {e}")
-                
-                # Aguardar próxima verificação
-                await asyncio.sleep(check_interval_minutes * 60)
+                        self.logger.error("Erro ao enviar resumo de saúde: %s", e)
                 
             except KeyboardInterrupt:
                 self.logger.info("Monitoramento interrompido pelo usuário")
                 break
             except Exception as e:
-                self.logger.error(f"Erro no monitoramento contínuo: {e}")
-                await asyncio.sleep(60)  # Aguardar 1 minuto antes de tentar novamente
+                self.logger.error("Erro no monitoramento contínuo: %s", e)
+                # Tentar novamente em até 1 minuto, sem somar à espera do ciclo
+                next_tick = min(next_tick, loop.time() + 60)
+            
+            # Aguardar próxima verificação; ciclo mais longo que o intervalo
+            # realinha a grade em vez de disparar os ciclos perdidos em sequência
+            now = loop.time()
+            if next_tick < now:
+                next_tick = now
+            await asyncio.sleep(next_tick - now)
+    
+    def _provider_name(self, url: str) -> str:
+        """Nome exibido para a URL (host), memorizado por URL"""
+        name = self._url_names.get(url)
+        if name is None:
+            name = url.split("//")[1].split("/")[0] if "//" in url else url
+            self._url_names[url] = name
+        return name
     
     def get_health_dashboard_data(self, provider_urls: List[str]) -> Dict[str, Any]:
         """
         Obtém dados para dashboard de saúde
         
+        O resultado fica em cache por _DASHBOARD_CACHE_TTL segundos para o
+        mesmo conjunto de URLs, ou até o próximo ciclo de verificação.
+        
         Args:
             provider_urls: Lista de URLs dos providers
             
         Returns:
             Dados estruturados para dashboard
         """
+        key = tuple(sorted(provider_urls))
+        now = time.monotonic()
+        cached = self._dashboard_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        dashboard_data = self._build_health_dashboard_data(provider_urls)
+        
+        if key not in self._dashboard_cache and len(self._dashboard_cache) >= _DASHBOARD_CACHE_MAXSIZE:
+            # Descarta a entrada mais antiga (ordem de inserção)
+            del self._dashboard_cache[next(iter(self._dashboard_cache))]
+        self._dashboard_cache[key] = (now + _DASHBOARD_CACHE_TTL, dashboard_data)
+        return dashboard_data
+    
+    def get_dashboard_etag(self, provider_urls: List[str]) -> str:
+        """
+        Calcula um ETag (fraco) para os dados do dashboard
+        
+        Muda sempre que alguma das URLs recebe uma verificação nova (ou tem o
+        cache limpo), sem precisar montar os dados do dashboard.
+        
+        Args:
+            provider_urls: Lista de URLs dos providers
+            
+        Returns:
+            ETag em hexadecimal, estável entre processos
+        """
+        cache = self.health_checker._last_check_cache
+        key = tuple(
+            (url, cache[url].timestamp if url in cache else None)
+            for url in provider_urls
+        )
+        return hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    
+    def clear_dashboard_cache(self) -> None:
+        """Descarta os dados de dashboard em cache"""
+        self._dashboard_cache.clear()
+    
+    def _build_health_dashboard_data(self, provider_urls: List[str]) -> Dict[str, Any]:
+        """Monta os dados do dashboard a partir do estado do health checker"""
         dashboard_data = {
             "last_updated": datetime.now(timezone.utc).isoformat(),
             "providers": []
         }
         
+        check_cache = self.health_checker._last_check_cache
+        all_metrics = self.health_checker.get_metrics_bulk(provider_urls)
+        
         for url in provider_urls:
             # Status atual (do cache)
             current_status = "unknown"
             response_time = None
             
-            if url in self.health_checker._last_check_cache:
-                result = self.health_checker._last_check_cache[url]
-                current_status = result.status.value
+            result = check_cache.get(url)
+            if result is not None:
+                current_status = result.status
                 response_time = result.response_time_ms
             
             # Métricas
-            metrics = self.health_checker.get_metrics(url)
+            metrics = all_metrics.get(url)
             
             # Uptime recente
             uptime_24h = self.health_checker.get_uptime_summary(url, hours=24)
             
             provider_data = {
                 "url": url,
-                "name": url.split("//")[1].split("/")[0] if "//" in url else url,
+                "name": self._provider_name(url),
                 "current_status": current_status,
                 "response_time_ms": response_time,
                 "uptime_percentage_24h": uptime_24h.get("uptime_percentage", 0),
@@ -367,12 +610,12 @@ class HealthIntegrationManager:
             test_result = await self.discord_notifier.test_webhook(name)
             
             if test_result:
-                self.logger.info(f"✅ Webhook '{name}' configurado e testado com sucesso")
+                self.logger.info("✅ Webhook '%s' configurado e testado com sucesso", name)
                 return True
             else:
-                self.logger.error(f"❌ Webhook '{name}' configurado mas falhou no teste")
+                self.logger.error("❌ Webhook '%s' configurado mas falhou no teste", name)
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Erro ao configurar webhook '{name}': {e}")
+            self.logger.error("Erro ao configurar webhook '%s': %s", name, e)
             return False
\ No newline at end of file
@@ -5,12 +5,19 @@ Este módulo implementa as rotas da web app para visualização
 e gerenciamento do sistema de Health Check.
 """
 
-from flask import Blueprint, render_template, jsonify, request, flash, redirect, url_for
+from flask import Blueprint, Response, render_template, jsonify, request, flash, redirect, url_for
 import asyncio
+import atexit
+import concurrent.futures
 import logging
+import os
+import threading
 from datetime import datetime, timezone
+from functools import lru_cache
 import json
+import orjson
 from pathlib import Path
+from urllib.parse import unquote
 
 from auto_uploader.health_integration import HealthIntegrationManager
 
@@ -23,21 +30,106 @@ logger = logging.getLogger("health_routes")
 # Instância global do health manager
 health_manager = None
 
+# Tempo máximo que uma rota espera por uma corrotina do health manager
+ASYNC_TIMEOUT_SECONDS = 120
+
+def _start_background_loop() -> asyncio.AbstractEventLoop:
+    """Cria um event loop rodando para sempre em uma thread daemon"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="health-loop", daemon=True)
+    thread.start()
+    return loop
+
 def init_health_manager(data_dir: Path = None):
     """Inicializa o health manager"""
     global health_manager
     if health_manager is None:
         health_manager = HealthIntegrationManager(data_dir)
+        # Um único loop para todas as requisições: sessões HTTP, conexões
+        # keep-alive e cache de DNS sobrevivem entre as chamadas
+        health_manager._loop = _start_background_loop()
+        # Sessões com pool de conexões vivem enquanto o processo viver
+        atexit.register(shutdown_health_manager)
 
-def run_async(coro):
-    """Executa corrotina em um loop de eventos"""
+def shutdown_health_manager():
+    """Fecha o health manager (sessões HTTP e gravações pendentes)"""
+    global health_manager
+    if health_manager is None:
+        return
+    _stop_monitor_task()
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(coro)
+        run_async(health_manager.aclose())
+    except Exception as e:
+        logger.error(f"Erro ao encerrar health manager: {e}")
+    loop = health_manager._loop
+    if loop is not None:
+        loop.call_soon_threadsafe(loop.stop)
+    health_manager = None
+
+def _stop_monitor_task() -> bool:
+    """Cancela o monitoramento contínuo em execução; True se havia um"""
+    task = health_manager._monitor_task
+    health_manager._monitor_task = None
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
+
+def run_async(coro, timeout: float = ASYNC_TIMEOUT_SECONDS):
+    """Executa corrotina no event loop persistente do health manager"""
+    future = asyncio.run_coroutine_threadsafe(coro, health_manager._loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+async def _call(func, args, kwargs):
+    return func(*args, **kwargs)
+
+def run_on_loop(func, *args, **kwargs):
+    """Executa uma chamada síncrona do health manager no event loop persistente
+
+    O histórico, as métricas e os caches são alterados pelas corrotinas que
+    rodam nesse loop (monitoramento contínuo, notificações); lê-los ou
+    alterá-los direto da thread da requisição pode pegar um deque no meio
+    de uma alteração.
+    """
+    return run_async(_call(func, args, kwargs))
+
+# URLs exemplo usadas enquanto a configuração não define "provider_urls"
+DEFAULT_PROVIDER_URLS = (
+    "https://api.example1.com/health",
+    "https://api.example2.com/health",
+    "https://api.example3.com/health"
+)
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def get_provider_urls() -> tuple:
+    """URLs dos providers monitorados ("provider_urls" no health_config.json)"""
+    # O mtime do arquivo entra na chave do cache: enquanto a configuração não
+    # mudar, as URLs vêm do cache sem reler o arquivo a cada requisição
+    config_file = health_manager.health_checker.config_file
+    return _load_provider_urls(str(config_file), _mtime(config_file))
+
+@lru_cache(maxsize=1)
+def _load_provider_urls(config_path, config_mtime):
+    try:
+        with open(config_path, 'rb') as f:
+            urls = orjson.loads(f.read()).get('provider_urls')
+    except (OSError, orjson.JSONDecodeError, AttributeError) as e:
+        logger.warning(f"Erro ao ler provider_urls da configuração: {e}")
+        urls = None
+    return tuple(urls) if urls else DEFAULT_PROVIDER_URLS
+
+def json_response(data) -> Response:
+    """Serializa a resposta com orjson (enums e datetimes nativos) em um só passo"""
+    return Response(orjson.dumps(data), mimetype='application/json')
 
 @health_bp.route('/dashboard')
 def dashboard():
@@ -51,15 +143,19 @@ def api_status():
         return jsonify({"error": "Health manager não inicializado"}), 500
     
     try:
-        # Lista de URLs exemplo - em produção, isso deveria vir da configuração
-        provider_urls = [
-            "https://api.example1.com/health",
-            "https://api.example2.com/health", 
-            "https://api.example3.com/health"
-        ]
+        provider_urls = list(get_provider_urls())
+        
+        # Painel sondando sem verificações novas: 304 sem montar os dados
+        etag = run_on_loop(health_manager.get_dashboard_etag, provider_urls)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
         
-        dashboard_data = health_manager.get_health_dashboard_data(provider_urls)
-        return jsonify(dashboard_data)
+        dashboard_data = run_on_loop(health_manager.get_health_dashboard_data, provider_urls)
+        response = jsonify(dashboard_data)
+        response.set_etag(etag, weak=True)
+        return response
         
     except Exception as e:
         logger.error(f"Erro ao obter status das APIs: {e}")
@@ -86,7 +182,7 @@ def check_apis():
         for url, result in results.items():
             json_results[url] = {
                 "url": result.url,
-                "status": result.status.value,
+                "status": result.status,
                 "response_time_ms": result.response_time_ms,
                 "status_code": result.status_code,
                 "error_message": result.error_message,
@@ -104,6 +200,15 @@ def check_apis():
         logger.error(f"Erro ao verificar APIs: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _collect_metrics(url):
+    """Métricas, resumos de uptime (24h/7d) e histórico recente de uma URL"""
+    checker = health_manager.health_checker
+    metrics = checker.get_metrics(url)
+    if not metrics:
+        return None, None, None
+    uptime = checker.get_uptime_summaries([url], (24, 168))[url]
+    return metrics, uptime, checker.get_recent_history(url, limit=50)
+
 @health_bp.route('/api/metrics/<path:url>')
 def api_metrics(url):
     """Obtém métricas detalhadas para uma URL"""
@@ -112,23 +217,18 @@ def api_metrics(url):
     
     try:
         # Decodificar URL
-        import urllib.parse
-        decoded_url = urllib.parse.unquote(url)
+        decoded_url = unquote(url)
         
-        # Obter métricas
-        metrics = health_manager.health_checker.get_metrics(decoded_url)
+        # Métricas, uptime e histórico lidos de uma vez no loop do health manager
+        metrics, uptime, recent_history = run_on_loop(_collect_metrics, decoded_url)
         
         if not metrics:
             return jsonify({"error": "Métricas não encontradas para esta URL"}), 404
         
-        # Obter resumos de uptime
-        uptime_24h = health_manager.health_checker.get_uptime_summary(decoded_url, hours=24)
-        uptime_7d = health_manager.health_checker.get_uptime_summary(decoded_url, hours=168)
+        uptime_24h = uptime[24]
+        uptime_7d = uptime[168]
         
-        # Obter histórico recente
-        recent_history = health_manager.health_checker.get_recent_history(decoded_url, limit=50)
-        
-        return jsonify({
+        return json_response({
             "url": decoded_url,
             "metrics": {
                 "total_checks": metrics.total_checks,
@@ -147,7 +247,7 @@ def api_metrics(url):
             "recent_history": [
                 {
                     "timestamp": h.timestamp,
-                    "status": h.status.value,
+                    "status": h.status,
                     "response_time_ms": h.response_time_ms,
                     "error_message": h.error_message,
                     "is_healthy": h.is_healthy
@@ -167,17 +267,12 @@ def health_report():
         return jsonify({"error": "Health manager não inicializado"}), 500
     
     try:
-        # Lista de URLs exemplo
-        provider_urls = [
-            "https://api.example1.com/health",
-            "https://api.example2.com/health",
-            "https://api.example3.com/health"
-        ]
+        provider_urls = list(get_provider_urls())
         
         # Gerar relatório assíncrono
         report = run_async(health_manager.get_provider_health_report(provider_urls))
         
-        return jsonify(report)
+        return json_response(report)
         
     except Exception as e:
         logger.error(f"Erro ao gerar relatório: {e}")
@@ -191,8 +286,8 @@ def config_page():
         return redirect(url_for('health.dashboard'))
     
     # Obter configurações atuais
-    config = health_manager.health_checker.get_config()
-    webhooks = health_manager.discord_notifier.list_webhooks()
+    config = run_on_loop(health_manager.health_checker.get_config)
+    webhooks = run_on_loop(health_manager.discord_notifier.list_webhooks)
     
     return render_template('health_config.html', config=config, webhooks=webhooks)
 
@@ -203,8 +298,8 @@ def api_config():
         return jsonify({"error": "Health manager não inicializado"}), 500
     
     if request.method == 'GET':
-        config = health_manager.health_checker.get_config()
-        webhooks = health_manager.discord_notifier.list_webhooks()
+        config = run_on_loop(health_manager.health_checker.get_config)
+        webhooks = run_on_loop(health_manager.discord_notifier.list_webhooks)
         
         return jsonify({
             "config": config,
@@ -217,13 +312,14 @@ def api_config():
             
             # Atualizar configuração do health checker
             if 'config' in data:
-                health_manager.health_checker.update_config(data['config'])
+                run_on_loop(health_manager.health_checker.update_config, data['config'])
             
             # Atualizar webhooks
             if 'webhooks' in data:
                 for webhook_name, webhook_data in data['webhooks'].items():
                     if webhook_data.get('action') == 'add':
-                        health_manager.discord_notifier.add_webhook(
+                        run_on_loop(
+                            health_manager.discord_notifier.add_webhook,
                             webhook_name,
                             webhook_data['url'],
                             webhook_data.get('username', 'Health Monitor'),
@@ -231,7 +327,7 @@ def api_config():
                             webhook_data.get('enabled', True)
                         )
                     elif webhook_data.get('action') == 'remove':
-                        health_manager.discord_notifier.remove_webhook(webhook_name)
+                        run_on_loop(health_manager.discord_notifier.remove_webhook, webhook_name)
             
             return jsonify({"success": True, "message": "Configuração atualizada"})
             
@@ -265,7 +361,7 @@ def notification_history():
     
     try:
         limit = request.args.get('limit', 50, type=int)
-        history = health_manager.discord_notifier.get_notification_history(limit)
+        history = run_on_loop(health_manager.discord_notifier.get_notification_history, limit)
         
         return jsonify({
             "notifications": history,
@@ -283,7 +379,8 @@ def clear_cache():
         return jsonify({"error": "Health manager não inicializado"}), 500
     
     try:
-        health_manager.health_checker.clear_cache()
+        run_on_loop(health_manager.health_checker.clear_cache)
+        run_on_loop(health_manager.clear_dashboard_cache)
         return jsonify({"success": True, "message": "Cache limpo com sucesso"})
         
     except Exception as e:
@@ -310,27 +407,47 @@ def start_monitoring():
         if not provider_urls:
             return jsonify({"error": "URLs são obrigatórias"}), 400
         
-        # Em um ambiente de produção, isso deveria ser executado em um processo separado
-        # ou usando um task queue como Celery
+        # Roda no loop em segundo plano: a requisição retorna na hora e os
+        # workers continuam livres; um novo início substitui o anterior
+        restarted = _stop_monitor_task()
+        health_manager._monitor_task = asyncio.run_coroutine_threadsafe(
+            health_manager.monitor_providers_continuously(provider_urls, check_interval, summary_interval),
+            health_manager._loop
+        )
         
         return jsonify({
             "success": True, 
-            "message": "Monitoramento configurado",
-            "note": "Implementar execução em background"
+            "message": "Monitoramento reiniciado" if restarted else "Monitoramento iniciado"
         })
         
     except Exception as e:
         logger.error(f"Erro ao iniciar monitoramento: {e}")
         return jsonify({"error": str(e)}), 500
 
+@health_bp.route('/api/monitoring/stop', methods=['POST'])
+def stop_monitoring():
+    """Interrompe o monitoramento contínuo"""
+    if not health_manager:
+        return jsonify({"error": "Health manager não inicializado"}), 500
+    
+    if _stop_monitor_task():
+        return jsonify({"success": True, "message": "Monitoramento interrompido"})
+    return jsonify({"success": False, "message": "Nenhum monitoramento em execução"})
+
 # Filtros Jinja2 personalizados para os templates
+@lru_cache(maxsize=1024)
+def _format_iso_timestamp(timestamp_str):
+    # fromisoformat (Python 3.11+) já aceita o sufixo 'Z'
+    return datetime.fromisoformat(timestamp_str).strftime('%d/%m/%Y %H:%M:%S')
+
 @health_bp.app_template_filter('format_timestamp')
 def format_timestamp(timestamp_str):
     """Formata timestamp para exibição"""
+    # Os mesmos timestamps do histórico se repetem a cada renderização:
+    # cada um é convertido uma única vez
     try:
         if timestamp_str:
-            dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            return dt.strftime('%d/%m/%Y %H:%M:%S')
+            return _format_iso_timestamp(timestamp_str)
         return '-'
     except Exception:
         return timestamp_str
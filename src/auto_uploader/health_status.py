@@ -0,0 +1,20 @@
+"""
+Status de saúde da API
+
+Módulo sem dependências externas: o notificador e o health checker
+compartilham o enum sem que importar um puxe o aiohttp do outro.
+"""
+
+from enum import StrEnum
+
+
+class HealthStatus(StrEnum):
+    """Status de saúde da API (o membro é a própria string do valor)"""
+    ONLINE = "online"
+    OFFLINE = "offline"
+    DEGRADED = "degraded"
+    UNKNOWN = "unknown"
+
+
+# Valor serializado -> membro do enum (evita HealthStatus(valor) por entrada)
+STATUS_LOOKUP = {status.value: status for status in HealthStatus}
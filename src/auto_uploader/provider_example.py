@@ -5,10 +5,136 @@ Este arquivo demonstra como um provider pode implementar o método
 get_update() para verificação otimizada de updates.
 """
 
-from typing import List
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiohttp
+from bs4 import BeautifulSoup
+from platformdirs import user_data_path
+
 from src.core.providers.infra.template.base import Base
 
 
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# Número do capítulo na URL: /obra/cap-45, /obra/cap-45-5, /obra/cap_45.5
+_CHAPTER_RE = re.compile(r'cap[-_/](\d+(?:[-_.]\d+)?)/?$')
+
+
+def _has_class(name: str) -> str:
+    """Predicado XPath equivalente ao seletor CSS .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if LXML_AVAILABLE:
+    # Compiladas uma vez e reutilizadas em todo parse
+    _ITEM_XPATH = etree.XPath(f"//div[{_has_class('latest')}]//div[{_has_class('item')}]")
+    _MANGA_XPATH = etree.XPath(f".//a[{_has_class('manga')}]")
+    _CHAPTER_XPATH = etree.XPath(f".//a[{_has_class('chapter')}]")
+    _DATE_XPATH = etree.XPath(".//time/@datetime")
+
+# Pool de processos para o parse com BeautifulSoup: é Python puro e, numa
+# thread, disputaria o GIL com o event loop e com o parse dos outros
+# providers. Criado sob demanda para não abrir processos só por importar.
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+
+def _get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Executor para _parse_recents_page
+    
+    Com lxml retorna None (pool de threads padrão do loop): o parse é C e
+    libera o GIL, sem o custo de serializar o HTML para outro processo.
+    """
+    global _PARSE_POOL
+    if LXML_AVAILABLE:
+        return None
+    if _PARSE_POOL is None:
+        with _PARSE_POOL_LOCK:
+            if _PARSE_POOL is None:
+                _PARSE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _PARSE_POOL
+
+
+# Linha da seção de recentes: (título, url da obra, número, url do capítulo,
+# data de upload, timestamp epoch da data ou None)
+RecentRow = Tuple[str, str, Union[int, float], str, Optional[str], Optional[float]]
+
+
+def _iter_chapter_links_lxml(body: bytes):
+    """(título, url da obra, url do capítulo, data) de cada link de capítulo, via lxml"""
+    if not body.strip():
+        return
+    tree = lxml_html.fromstring(body)
+    for item in _ITEM_XPATH(tree):
+        manga_links = _MANGA_XPATH(item)
+        if not manga_links:
+            continue
+        titulo = manga_links[0].text_content().strip()
+        url_relativa = manga_links[0].get('href', '')
+        for chapter_link in _CHAPTER_XPATH(item):
+            dates = _DATE_XPATH(chapter_link)
+            yield titulo, url_relativa, chapter_link.get('href', ''), str(dates[0]) if dates else None
+
+
+def _iter_chapter_links_bs4(body: bytes):
+    """(título, url da obra, url do capítulo, data) de cada link de capítulo, via BeautifulSoup"""
+    soup = BeautifulSoup(body, 'html.parser')
+    for item in soup.select('div.latest div.item'):
+        manga_link = item.select_one('a.manga')
+        if manga_link is None:
+            continue
+        titulo = manga_link.get_text(strip=True)
+        url_relativa = manga_link.get('href', '')
+        for chapter_link in item.select('a.chapter'):
+            date = chapter_link.select_one('time')
+            yield titulo, url_relativa, chapter_link.get('href', ''), date.get('datetime') if date else None
+
+
+def _parse_recents_page(body: bytes) -> List[RecentRow]:
+    """
+    Extrai os capítulos da seção de recentes, do mais novo para o mais antigo
+    
+    Usa lxml (XPath pré-compilado) quando instalado e BeautifulSoup caso
+    contrário. Roda fora do event loop (_get_parse_pool): o parse é CPU e
+    não deve segurar as requisições dos outros providers.
+    """
+    links = _iter_chapter_links_lxml(body) if LXML_AVAILABLE else _iter_chapter_links_bs4(body)
+    rows = []
+    
+    for titulo, url_relativa, url, data_upload in links:
+        match = _CHAPTER_RE.search(url)
+        if match is None:
+            continue
+        numero = float(match.group(1).replace('-', '.').replace('_', '.'))
+        if numero.is_integer():
+            # Capítulo inteiro (o caso comum): int, sem o float por linha
+            numero = int(numero)
+        try:
+            ts = datetime.fromisoformat(data_upload).timestamp() if data_upload else None
+        except ValueError:
+            ts = None
+        rows.append((titulo, url_relativa, numero, url, data_upload, ts))
+    
+    return rows
+
+
 class ExampleProvider(Base):
     """
     Exemplo de provider que implementa get_update() para verificação otimizada
@@ -19,55 +145,186 @@ class ExampleProvider(Base):
     domain = ['example.com']
     has_login = False
     
-    def get_update(self) -> List[dict]:
+    base_url = 'https://example.com'
+    recents_path = '/latest'
+    request_timeout = aiohttp.ClientTimeout(total=10)
+    # Tentativas por página quando o site responde 429/503
+    max_attempts = 3
+    # Páginas de recentes lidas por verificação (sem cursor, só a primeira)
+    max_recent_pages = 10
+    # Onde o cursor (último capítulo visto) e os validadores HTTP
+    # (ETag/Last-Modified) são guardados entre execuções
+    state_dir = user_data_path('py_web') / 'update_state'
+    # Páginas de recentes já parseadas, por URL: (expira_em, linhas).
+    # Evita refazer a mesma requisição em verificações próximas e cobre
+    # falhas de rede com a última cópia conhecida.
+    recents_cache_ttl = 60.0
+    _recents_cache: Dict[str, Tuple[float, List[RecentRow]]] = {}
+    
+    @property
+    def _state_file(self) -> Path:
+        return Path(self.state_dir) / f'{self.name}.json'
+    
+    def _load_state(self) -> dict:
+        try:
+            with open(self._state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_state(self, state: dict) -> None:
+        self._state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+    
+    async def _fetch_recents_page(self, session: aiohttp.ClientSession, page: int,
+                                  state: Optional[dict] = None) -> Optional[List[RecentRow]]:
         """
-        Implementação exemplo do método get_update()
+        Baixa e parseia uma página de recentes
+        
+        Com `state`, a requisição é condicional (If-None-Match /
+        If-Modified-Since) e os validadores da resposta são gravados nele.
+        Retorna None quando o servidor responde 304 Not Modified.
+        
+        Uma cópia ainda válida em _recents_cache dispensa a rede; se a
+        requisição falhar, a cópia expirada é usada no lugar do erro.
+        """
+        url = f'{self.base_url}{self.recents_path}?page={page}'
+        cached = self._recents_cache.get(url)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        headers = {}
+        if state is not None:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        
+        try:
+            for attempt in range(self.max_attempts):
+                # Respeita o rate limit do domínio (compartilhado entre chamadas)
+                async with self.limiter.acquire():
+                    async with session.get(url, headers=headers, timeout=self.request_timeout) as response:
+                        throttled = self.limiter.record_response(
+                            response.status, response.headers.get('Retry-After')
+                        )
+                        if throttled and attempt + 1 < self.max_attempts:
+                            # O limitador já reduziu a concorrência e pausa o
+                            # próximo acquire() pelo Retry-After
+                            continue
+                        if response.status == 304:
+                            if cached is not None:
+                                self._recents_cache[url] = (now + self.recents_cache_ttl, cached[1])
+                            return None
+                        response.raise_for_status()
+                        body = await response.read()
+                        if state is not None:
+                            state['etag'] = response.headers.get('ETag')
+                            state['last_modified'] = response.headers.get('Last-Modified')
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if cached is None:
+                raise
+            return cached[1]
+        
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(_get_parse_pool(), _parse_recents_page, body)
+        self._recents_cache[url] = (time.monotonic() + self.recents_cache_ttl, rows)
+        return rows
+    
+    async def get_update_async(self, session: aiohttp.ClientSession) -> List[dict]:
+        """
+        Busca obras com novos capítulos na seção de recentes do site
         
-        Este método busca obras com novos capítulos diretamente da página
-        inicial ou seção de recentes do site, evitando verificação individual.
+        A primeira página é pedida com GET condicional: se nada mudou desde
+        a verificação anterior o servidor responde 304 sem corpo e a lista
+        volta vazia sem parse. Caso contrário lê as páginas de recentes
+        (/latest?page=1, 2, ...) só até chegar ao último capítulo já visto:
+        o número de requisições depende do que saiu desde então, não do
+        número de obras. A sessão é do chamador, para que vários providers
+        compartilhem conexões e rodem em paralelo (ver get_updates_concurrently).
         
+        Args:
+            session: Sessão aiohttp compartilhada
+            
         Returns:
             Lista de obras com novos capítulos
         """
         try:
-            # Simulação de busca na página inicial/recentes
-            # Em implementação real, faria requests para o site
+            state = self._load_state()
+            saved_state = dict(state)
+            last_seen = state.get('last_seen_chapter_ts')
+            max_pages = self.max_recent_pages if last_seen is not None else 1
+            newest = last_seen
+            obras: Dict[str, dict] = {}
             
-            # Exemplo de retorno
-            return [
-                {
-                    'titulo': 'Manga Exemplo 1',
-                    'url_relativa': '/manga-exemplo-1',
-                    'capitulos': [
-                        {
-                            'numero': 125.0,
-                            'url': '/manga-exemplo-1/cap-125',
-                            'data_upload': '2025-10-15'
-                        },
-                        {
-                            'numero': 126.0, 
-                            'url': '/manga-exemplo-1/cap-126',
-                            'data_upload': '2025-10-15'
-                        }
-                    ]
-                },
-                {
-                    'titulo': 'Manga Exemplo 2',
-                    'url_relativa': '/manga-exemplo-2',
-                    'capitulos': [
-                        {
-                            'numero': 45.5,
-                            'url': '/manga-exemplo-2/cap-45-5',
-                            'data_upload': '2025-10-15'
+            for page in range(1, max_pages + 1):
+                rows = await self._fetch_recents_page(session, page, state if page == 1 else None)
+                if rows is None:
+                    # 304: a página de recentes não mudou
+                    return []
+                if not rows:
+                    break
+                
+                reached_cursor = False
+                for titulo, url_relativa, numero, url, data_upload, ts in rows:
+                    if ts is not None:
+                        if last_seen is not None and ts <= last_seen:
+                            # Daqui para trás tudo já foi visto
+                            reached_cursor = True
+                            break
+                        if newest is None or ts > newest:
+                            newest = ts
+                    
+                    obra = obras.get(url_relativa)
+                    if obra is None:
+                        # Internados: as linhas vêm de outro processo/thread
+                        # como cópias novas; assim a mesma obra reaparecendo
+                        # a cada verificação reaproveita uma única string
+                        url_relativa = sys.intern(url_relativa)
+                        obra = obras[url_relativa] = {
+                            'titulo': sys.intern(titulo),
+                            'url_relativa': url_relativa,
+                            'capitulos': []
                         }
-                    ]
-                }
-            ]
+                    obra['capitulos'].append({
+                        'numero': numero,
+                        'url': url,
+                        'data_upload': data_upload
+                    })
+                
+                if reached_cursor:
+                    break
+            
+            state['last_seen_chapter_ts'] = newest
+            if state != saved_state:
+                self._save_state(state)
+            
+            return list(obras.values())
             
         except Exception as e:
             # Em caso de erro, lançar NotImplementedError para usar fallback
             raise NotImplementedError(f"Erro na verificação otimizada: {e}")
     
+    def get_update(self) -> List[dict]:
+        """
+        Implementação exemplo do método get_update()
+        
+        Versão síncrona usada pelo ScanUpdateManager (que já roda cada
+        scan em uma thread própria); delega para get_update_async().
+        
+        Returns:
+            Lista de obras com novos capítulos
+        """
+        return asyncio.run(self._get_update_own_session())
+    
+    async def _get_update_own_session(self) -> List[dict]:
+        async with aiohttp.ClientSession() as session:
+            return await self.get_update_async(session)
+    
     def getManga(self, link: str):
         """Implementação padrão getManga"""
         # Implementação específica do provider
@@ -112,6 +369,23 @@ class LegacyProvider(Base):
         pass
 
 
+async def get_updates_concurrently(providers: List[Base]) -> Dict[str, Union[List[dict], Exception]]:
+    """
+    Executa get_update_async() de vários providers ao mesmo tempo
+    
+    O tempo total passa a ser o do provider mais lento, não a soma de todos.
+    
+    Returns:
+        Resultado (ou exceção) de cada provider, por nome
+    """
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(
+            *(provider.get_update_async(session) for provider in providers),
+            return_exceptions=True
+        )
+    return {provider.name: result for provider, result in zip(providers, results)}
+
+
 # Documentação de implementação
 """
 GUIA DE IMPLEMENTAÇÃO DO MÉTODO get_update()
@@ -123,6 +397,14 @@ Para implementar verificação otimizada de updates em um provider:
     def get_update(self) -> List[dict]:
         # Sua implementação aqui
         
+   Para I/O assíncrono, implemente get_update_async(session) (recebe a
+   sessão aiohttp do chamador) e faça get_update() delegar para ela, como
+   no ExampleProvider; o parse de HTML sai do event loop (executor).
+   
+   Se o site tiver API JSON, use self.fetch_json(session, url) (orjson)
+   ou, para feeds grandes, "async for item in self.iter_json_items(
+   session, url, 'data.item')" (streaming com ijson) no lugar do HTML.
+        
 2. RETORNE uma lista de dicionários com a estrutura:
     [
         {
@@ -130,7 +412,7 @@ Para implementar verificação otimizada de updates em um provider:
             'url_relativa': str,        # URL relativa da obra
             'capitulos': [              # Lista de novos capítulos
                 {
-                    'numero': float,    # Número do capítulo
+                    'numero': int | float,  # Número do capítulo (int se inteiro)
                     'url': str,         # URL do capítulo
                     'data_upload': str  # Data (opcional)
                 }
@@ -153,7 +435,10 @@ Para implementar verificação otimizada de updates em um provider:
    - Uma requisição deve cobrir múltiplas obras
    - Evite fazer uma requisição por obra
    - Use cache quando possível
-   - Respeite rate limits do site
+   - Respeite rate limits do site: envolva cada requisição em
+     "async with self.limiter.acquire()" e ajuste rps/burst/max_concurrency;
+     informe o status com self.limiter.record_response(...) para que a
+     concorrência se adapte (sobe com sucessos, cai à metade em 429/503)
 
 6. TESTES:
    - Sempre teste com dados reais
@@ -56,7 +56,10 @@ class ScanUpdateManager:
         self.metrics_file = self.cache_dir / "update_metrics.json"
         
         # Configurações
-        self.cache_duration_minutes = 30
+        # Toda entrada do cache é um resultado negativo ("sem capítulo novo"
+        # na verificação individual): vale 24h e é invalidada assim que o
+        # mapeamento registra um capítulo além do verificado
+        self.negative_cache_duration_minutes = 24 * 60
         self.max_concurrent_checks = 5
         self.request_delay = 1.0  # segundos entre requisições
         
@@ -117,10 +120,10 @@ class ScanUpdateManager:
             self.logger.error(f"Erro ao salvar cache: {e}")
     
     def _clean_expired_cache(self) -> None:
-        """Remove entradas expiradas do cache"""
+        """Remove entradas expiradas do cache (TTL dos resultados negativos)"""
         keys_to_remove = []
         for key, entry in self._cache.items():
-            if entry.is_expired(self.cache_duration_minutes):
+            if entry.is_expired(self.negative_cache_duration_minutes):
                 keys_to_remove.append(key)
         
         for key in keys_to_remove:
@@ -395,11 +398,16 @@ class ScanUpdateManager:
             # Verificar cada obra individualmente
             for obra in mapping_data.obras:
                 try:
-                    # Verificar cache primeiro
+                    # Verificar cache primeiro: a entrada só vale para o
+                    # mesmo último capítulo conhecido da obra
                     cache_key = self._get_cache_key(scan_name, obra.id)
                     cached_entry = self._cache.get(cache_key)
+                    ultimo_cap = obra.capitulos[-1] if obra.capitulos else None
                     
-                    if cached_entry and not cached_entry.is_expired(self.cache_duration_minutes):
+                    if (cached_entry
+                            and ultimo_cap is not None
+                            and cached_entry.ultimo_capitulo_verificado.get('numero') == ultimo_cap.numero
+                            and not cached_entry.is_expired(self.negative_cache_duration_minutes)):
                         result.increment_metrica("cache_hits")
                         continue
                     
@@ -417,7 +425,6 @@ class ScanUpdateManager:
                         time.sleep(capabilities.rate_limit_delay)
                     
                     # Simular atualização do cache
-                    ultimo_cap = obra.capitulos[-1] if obra.capitulos else None
                     if ultimo_cap:
                         cache_entry = UpdateCacheEntry(
                             scan_name=scan_name,
@@ -514,9 +521,9 @@ class ScanUpdateManager:
         return batch_result
     
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Retorna estatísticas do cache"""
+        """Retorna estatísticas do cache (expiração pelo TTL dos resultados negativos)"""
         total_entries = len(self._cache)
-        expired_entries = sum(1 for entry in self._cache.values() if entry.is_expired(self.cache_duration_minutes))
+        expired_entries = sum(1 for entry in self._cache.values() if entry.is_expired(self.negative_cache_duration_minutes))
         
         return {
             "total_entries": total_entries,
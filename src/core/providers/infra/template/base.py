@@ -1,13 +1,149 @@
-from typing import List
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import ijson
+import orjson
 from core.download.application.use_cases import DownloadUseCase
 from core.providers.domain.entities import Chapter, Pages, Manga
 from core.providers.domain.provider_repository import ProviderRepository
 
+class RateLimiter:
+    """
+    Token bucket (rps/burst) somado a um limite de requisições simultâneas
+    
+    O limite de concorrência é adaptativo (AIMD): sobe 1 a cada
+    SUCCESS_STEP respostas ok e cai pela metade em 429/503, pausando as
+    próximas requisições pelo Retry-After. Assim o limite converge para
+    a capacidade real do site em vez de uma constante conservadora.
+    
+    O saldo de tokens e o limite são compartilhados entre threads e event
+    loops; a contagem de requisições em andamento é por event loop.
+    """
+    
+    MIN_CONCURRENCY = 1
+    MAX_CONCURRENCY = 32
+    SUCCESS_STEP = 20
+    MAX_RETRY_AFTER = 60.0
+    
+    def __init__(self, rps: float, burst: int, max_concurrency: int):
+        self.rps = rps
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._concurrency = max_concurrency
+        self._successes = 0
+        self._paused_until = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        # loop -> [Condition, requisições em andamento]
+        self._slots = weakref.WeakKeyDictionary()
+    
+    @property
+    def concurrency(self) -> int:
+        """Limite atual de requisições simultâneas"""
+        return self._concurrency
+    
+    def _reserve(self) -> float:
+        """Consome um token e retorna quanto tempo esperar até ele existir"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+            self._updated = now
+            # Saldo negativo = tokens já reservados por quem está esperando
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rps
+            return max(wait, self._paused_until - now)
+    
+    def _get_slots(self) -> list:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = [asyncio.Condition(), 0]
+        return slots
+    
+    def record_success(self) -> None:
+        """Aumento aditivo: +1 de concorrência a cada SUCCESS_STEP sucessos"""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.SUCCESS_STEP:
+                self._successes = 0
+                self._concurrency = min(self.MAX_CONCURRENCY, self._concurrency + 1)
+    
+    def record_throttled(self, retry_after: Optional[str] = None) -> None:
+        """Redução multiplicativa após 429/503, pausando pelo Retry-After"""
+        try:
+            delay = min(max(float(retry_after), 0.0), self.MAX_RETRY_AFTER)
+        except (TypeError, ValueError):
+            delay = 1.0
+        with self._lock:
+            self._successes = 0
+            self._concurrency = max(self.MIN_CONCURRENCY, self._concurrency // 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+    
+    def record_response(self, status: int, retry_after: Optional[str] = None) -> bool:
+        """
+        Ajusta o limite a partir do status HTTP
+        
+        Returns:
+            True se o site pediu para diminuir o ritmo (429/503)
+        """
+        if status in (429, 503):
+            self.record_throttled(retry_after)
+            return True
+        if status < 400:
+            self.record_success()
+        return False
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Aguarda vaga e token antes de uma requisição"""
+        slots = self._get_slots()
+        condition = slots[0]
+        async with condition:
+            await condition.wait_for(lambda: slots[1] < self._concurrency)
+            slots[1] += 1
+        try:
+            wait = self._reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            async with condition:
+                slots[1] -= 1
+                # notify_all: o limite pode ter subido e liberado mais de uma vaga
+                condition.notify_all()
+
+
 class Base(ProviderRepository):
     name = ''
     lang = ''
     domain = ['']
     has_login = False
+    
+    # Limites de requisição por domínio (usados por self.limiter)
+    rps = 5
+    burst = 10
+    max_concurrency = 4  # valor inicial; o RateLimiter adapta (AIMD)
+    
+    # Um limitador por domínio, compartilhado por todas as instâncias
+    _limiters: Dict[str, RateLimiter] = {}
+    _limiters_lock = threading.Lock()
+    
+    @property
+    def limiter(self) -> RateLimiter:
+        """Limitador de requisições do domínio principal do provider"""
+        key = self.domain[0]
+        limiter = Base._limiters.get(key)
+        if limiter is None:
+            with Base._limiters_lock:
+                limiter = Base._limiters.setdefault(
+                    key, RateLimiter(self.rps, self.burst, self.max_concurrency)
+                )
+        return limiter
 
     def login() -> None:
         raise NotImplementedError()
@@ -37,7 +173,7 @@ class Base(ProviderRepository):
                     'url_relativa': str,
                     'capitulos': [
                         {
-                            'numero': float,
+                            'numero': int | float (int quando inteiro),
                             'url': str,
                             'data_upload': str (opcional)
                         }
@@ -53,5 +189,50 @@ class Base(ProviderRepository):
             "Use verificação individual com getChapters()."
         )
     
+    async def get_update_async(self, session) -> List[dict]:
+        """
+        Versão assíncrona opcional de get_update()
+        
+        Providers com I/O assíncrono sobrescrevem este método usando a
+        sessão aiohttp recebida; o padrão executa get_update() em uma thread.
+        
+        Args:
+            session: Sessão aiohttp compartilhada pelo chamador
+        """
+        return await asyncio.to_thread(self.get_update)
+    
+    async def fetch_json(self, session, url: str, **kwargs) -> Any:
+        """
+        GET de uma API JSON respeitando o limitador do domínio
+        
+        O corpo é decodificado com orjson direto dos bytes, sem passar
+        por str. Para providers com API (ex.: feed de capítulos recentes),
+        prefira este caminho ao scraping de HTML em get_update_async().
+        
+        Args:
+            session: Sessão aiohttp
+            url: URL da API
+            **kwargs: Repassados para session.get (params, headers, timeout)
+        """
+        async with self.limiter.acquire():
+            async with session.get(url, **kwargs) as response:
+                self.limiter.record_response(response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+    
+    async def iter_json_items(self, session, url: str, prefix: str = 'item', **kwargs) -> AsyncIterator[Any]:
+        """
+        Itera os itens de um feed JSON grande sem carregar o corpo inteiro
+        
+        Os itens em `prefix` (sintaxe do ijson, ex.: 'data.item') são lidos
+        do stream da resposta pelo ijson, com memória constante.
+        """
+        async with self.limiter.acquire():
+            async with session.get(url, **kwargs) as response:
+                self.limiter.record_response(response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                async for item in ijson.items(response.content, prefix, use_float=True):
+                    yield item
+    
     def download(self, pages: Pages, fn: any, headers=None, cookies=None):
         return DownloadUseCase().execute(pages=pages, fn=fn, headers=headers, cookies=cookies)
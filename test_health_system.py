@@ -87,6 +87,19 @@ class TestHealthChecker(unittest.TestCase):
         self.assertEqual(metrics.uptime_percentage, 50.0)
         self.assertEqual(metrics.failure_rate, 50.0)
     
+    def test_health_metrics_average_response_time(self):
+        """Testa média do tempo de resposta das verificações bem-sucedidas"""
+        metrics = HealthMetrics()
+        
+        for response_time in (100.0, 200.0, 300.0, 400.0):
+            metrics.update_from_result(HealthCheckResult(
+                url=self.test_url,
+                status=HealthStatus.ONLINE,
+                response_time_ms=response_time
+            ))
+        
+        self.assertAlmostEqual(metrics.avg_response_time_ms, 250.0)
+    
     def test_config_management(self):
         """Testa gerenciamento de configurações"""
         # Configuração padrão
@@ -9,6 +9,9 @@ Testes completos para o DiscordNotifier, incluindo:
 - Templates de mensagem
 - Fallback para logs
 - Integração com sistema de quarentena
+
+E o notificador de health check (auto_uploader.discord_notifier): histórico
+e nova tentativa após 429.
 """
 
 import unittest
@@ -16,6 +19,8 @@ import asyncio
 import time
 import json
 import threading
+import tempfile
+import shutil
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime, timedelta
 from collections import deque
@@ -32,6 +37,11 @@ from notifications.discord import (
     DiscordMessage,
     get_discord_notifier
 )
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from auto_uploader import discord_notifier as health_discord_notifier
+from auto_uploader.discord_notifier import DiscordNotifier as HealthDiscordNotifier
 
 
 class TestNotificationConfig(unittest.TestCase):
@@ -524,6 +534,173 @@ class TestIntegrationWithQuarantine(unittest.TestCase):
             self.assertFalse(result2)
 
 
+class TestHealthNotifierJsonl(unittest.TestCase):
+    """Testes para o histórico JSONL do notificador de health check"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _entry(self, i):
+        return {"type": "status_change", "url": f"https://api{i}.example.com", "timestamp": i}
+
+    def _lines(self, notifier):
+        return [line for line in notifier.notification_history_file.read_bytes().splitlines() if line.strip()]
+
+    def test_entries_are_appended_and_reloaded(self):
+        """Cada notificação vira uma linha; uma nova instância recarrega tudo"""
+        notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+        for i in range(3):
+            notifier._add_to_history(self._entry(i))
+
+        self.assertEqual(len(self._lines(notifier)), 3)
+
+        reloaded = HealthDiscordNotifier(data_dir=self.temp_dir)
+        self.assertEqual(list(reloaded._notification_history), [self._entry(i) for i in range(3)])
+
+    def test_legacy_json_history_is_migrated(self):
+        """O histórico antigo (lista JSON) é carregado e reescrito em JSONL"""
+        notifications_dir = self.temp_dir / "notifications"
+        notifications_dir.mkdir(parents=True)
+        legacy = [self._entry(1), self._entry(2)]
+        (notifications_dir / "notification_history.json").write_text(json.dumps(legacy))
+
+        notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+
+        self.assertEqual(list(notifier._notification_history), legacy)
+        self.assertEqual([json.loads(line) for line in self._lines(notifier)], legacy)
+
+    def test_truncated_line_is_skipped(self):
+        """Uma linha cortada por escrita interrompida não impede a carga do resto"""
+        notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+        notifier._add_to_history(self._entry(1))
+        with open(notifier.notification_history_file, 'ab') as f:
+            f.write(b'{"type": "status_change", "url": "https://api2.exa')
+
+        reloaded = HealthDiscordNotifier(data_dir=self.temp_dir)
+        self.assertEqual(list(reloaded._notification_history), [self._entry(1)])
+
+    def test_compaction_keeps_file_bounded(self):
+        """Passadas _HISTORY_MAXLEN linhas acrescentadas, o arquivo é reescrito só com o histórico em memória"""
+        with patch.object(health_discord_notifier, '_HISTORY_MAXLEN', 3):
+            notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+            for i in range(10):
+                notifier._add_to_history(self._entry(i))
+                self.assertLessEqual(len(self._lines(notifier)), 2 * 3 + 1)
+
+            reloaded = HealthDiscordNotifier(data_dir=self.temp_dir)
+
+        self.assertEqual(list(reloaded._notification_history), [self._entry(i) for i in range(7, 10)])
+
+
+class TestHealthNotifierHistory(unittest.TestCase):
+    """Testes para o histórico do notificador de health check"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _entry(self, i):
+        return {"type": "status_change", "url": f"https://api{i}.example.com", "timestamp": i}
+
+    def test_entry_saved_when_loop_ends_without_close(self):
+        """Uma entrada adicionada dentro de asyncio.run é gravada mesmo sem close()"""
+        notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+
+        async def go():
+            notifier._add_to_history(self._entry(1))
+
+        asyncio.run(go())
+
+        reloaded = HealthDiscordNotifier(data_dir=self.temp_dir)
+        self.assertEqual(list(reloaded._notification_history), [self._entry(1)])
+
+    def test_context_manager_flushes_history(self):
+        """async with grava o histórico pendente ao sair"""
+        async def go():
+            async with HealthDiscordNotifier(data_dir=self.temp_dir) as notifier:
+                notifier._add_to_history(self._entry(1))
+                notifier._add_to_history(self._entry(2))
+
+        asyncio.run(go())
+
+        reloaded = HealthDiscordNotifier(data_dir=self.temp_dir)
+        self.assertEqual(len(reloaded._notification_history), 2)
+
+
+class TestHealthNotifierRetryAfter(unittest.IsolatedAsyncioTestCase):
+    """Testes para o envio ao webhook com 429"""
+
+    async def asyncSetUp(self):
+        """Webhook local que responde 429 nas primeiras requisições"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.throttle_next = 0
+        self.requests = 0
+
+        app = web.Application()
+        app.router.add_post('/webhook', self._webhook)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.notifier = HealthDiscordNotifier(data_dir=self.temp_dir)
+        self.config = health_discord_notifier.DiscordWebhookConfig(url=str(self.server.make_url('/webhook')))
+
+    async def asyncTearDown(self):
+        """Fecha notificador e servidor"""
+        await self.notifier.close()
+        await self.server.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _webhook(self, request):
+        self.requests += 1
+        if self.throttle_next:
+            self.throttle_next -= 1
+            return web.Response(status=429, headers={'Retry-After': '1000'})
+        return web.Response(status=204)
+
+    async def test_retries_after_capped_retry_after(self):
+        """Um 429 espera o Retry-After (limitado a _MAX_RETRY_AFTER) e tenta de novo"""
+        self.throttle_next = 1
+        loop = asyncio.get_running_loop()
+
+        with patch.object(health_discord_notifier, '_MAX_RETRY_AFTER', 0.1):
+            start = loop.time()
+            sent = await self.notifier._send_webhook_message(self.config, [])
+            elapsed = loop.time() - start
+
+        self.assertTrue(sent)
+        self.assertEqual(self.requests, 2)
+        self.assertGreaterEqual(elapsed, 0.1)
+        self.assertLess(elapsed, 5)
+
+    async def test_gives_up_after_second_429(self):
+        """Só há uma nova tentativa; um segundo 429 devolve False"""
+        self.throttle_next = 2
+
+        with patch.object(health_discord_notifier, '_MAX_RETRY_AFTER', 0.01):
+            sent = await self.notifier._send_webhook_message(self.config, [])
+
+        self.assertFalse(sent)
+        self.assertEqual(self.requests, 2)
+
+    def test_retry_after_parsing(self):
+        """Retry-After inválido vale 1s; negativos viram 0 e o máximo é _MAX_RETRY_AFTER"""
+        parse = health_discord_notifier._retry_after_seconds
+        self.assertEqual(parse("2.5"), 2.5)
+        self.assertEqual(parse("-3"), 0.0)
+        self.assertEqual(parse("1000"), health_discord_notifier._MAX_RETRY_AFTER)
+        self.assertEqual(parse(None), 1.0)
+        self.assertEqual(parse("data inválida"), 1.0)
+
+
 if __name__ == '__main__':
     # Configurar logging para testes
     import logging
@@ -0,0 +1,233 @@
+"""
+Testes para o APIHealthChecker
+==============================
+
+Cobre o histórico de verificações:
+- Limite do histórico ao atualizar a configuração
+- Histórico em NDJSON (carga, migração do formato antigo e compactação)
+- Contadores circulares por hora de HealthMetrics
+- Gravação do que está pendente ao fechar o checker
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+import json
+import time
+from datetime import datetime, timezone
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from auto_uploader.health_checker import APIHealthChecker, HealthCheckResult, HealthStatus, HealthMetrics
+
+
+class TestHistoryConfig(unittest.TestCase):
+    """Testes para o limite do histórico"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.checker = APIHealthChecker(data_dir=self.temp_dir)
+        self.url = "https://api.example.com"
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.checker.flush()
+        self.checker._close_history_file()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_update_config_resizes_per_url_history(self):
+        """Reduzir max_history_entries também limita o histórico por URL"""
+        for i in range(10):
+            self.checker._add_to_history(
+                HealthCheckResult(self.url, HealthStatus.ONLINE, response_time_ms=float(i))
+            )
+
+        self.checker.update_config({"max_history_entries": 3})
+
+        self.assertEqual(self.checker._history.maxlen, 3)
+        self.assertEqual(self.checker._history_by_url[self.url].maxlen, 3)
+        recent = self.checker.get_recent_history(self.url, limit=10)
+        self.assertEqual([r.response_time_ms for r in recent], [9.0, 8.0, 7.0])
+        self.assertEqual(
+            [r.response_time_ms for r in recent],
+            [r.response_time_ms for r in reversed(self.checker._history)]
+        )
+
+
+def _result_at(url, status, epoch_seconds, response_time_ms=None):
+    """Resultado com timestamp fixo (segundos epoch)"""
+    timestamp = datetime.fromtimestamp(epoch_seconds, timezone.utc).isoformat()
+    return HealthCheckResult(url, status, response_time_ms=response_time_ms, timestamp=timestamp)
+
+
+class TestNdjsonHistory(unittest.TestCase):
+    """Testes para o histórico em NDJSON"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.url = "https://api.example.com"
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _new_checker(self):
+        checker = APIHealthChecker(data_dir=self.temp_dir)
+        self.addCleanup(checker._close_history_file)
+        return checker
+
+    def _history_lines(self, checker):
+        return [line for line in checker.history_file.read_bytes().splitlines() if line.strip()]
+
+    def test_results_are_appended_and_reloaded(self):
+        """Cada verificação vira uma linha; uma nova instância recarrega tudo"""
+        checker = self._new_checker()
+        for i in range(3):
+            checker._add_to_history(HealthCheckResult(self.url, HealthStatus.ONLINE, response_time_ms=float(i)))
+        checker.flush()
+
+        self.assertEqual(len(self._history_lines(checker)), 3)
+
+        reloaded = self._new_checker()
+        self.assertEqual([r.response_time_ms for r in reloaded._history], [0.0, 1.0, 2.0])
+        self.assertIs(reloaded._history[0].status, HealthStatus.ONLINE)
+        self.assertEqual(len(reloaded._history_by_url[self.url]), 3)
+
+    def test_truncated_line_is_skipped(self):
+        """Uma linha cortada por escrita interrompida não impede a carga do resto"""
+        checker = self._new_checker()
+        checker._add_to_history(HealthCheckResult(self.url, HealthStatus.OFFLINE, error_message="Timeout"))
+        checker.flush()
+        checker._close_history_file()
+        with open(checker.history_file, 'ab') as f:
+            f.write(b'{"url": "https://api.example.com", "sta')
+
+        reloaded = self._new_checker()
+        self.assertEqual(len(reloaded._history), 1)
+        self.assertIs(reloaded._history[0].status, HealthStatus.OFFLINE)
+
+    def test_legacy_json_history_is_migrated(self):
+        """O histórico antigo (lista JSON) é carregado e reescrito em NDJSON"""
+        health_dir = self.temp_dir / "health"
+        health_dir.mkdir(parents=True)
+        legacy = [
+            {"url": self.url, "status": "online", "response_time_ms": 100.0,
+             "status_code": 200, "error_message": None, "timestamp": "2025-10-15T12:00:00+00:00"},
+            {"url": self.url, "status": "degraded", "response_time_ms": 3000.0,
+             "status_code": 200, "error_message": None, "timestamp": "2025-10-15T12:05:00+00:00"},
+        ]
+        (health_dir / "health_history.json").write_text(json.dumps(legacy))
+
+        checker = self._new_checker()
+
+        self.assertEqual([r.status for r in checker._history], [HealthStatus.ONLINE, HealthStatus.DEGRADED])
+        lines = self._history_lines(checker)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["status"], "degraded")
+
+    def test_compaction_keeps_file_bounded(self):
+        """Depois de max_history_entries acréscimos o arquivo é reescrito só com o histórico em memória"""
+        checker = self._new_checker()
+        checker.update_config({"max_history_entries": 3})
+
+        for i in range(10):
+            checker._add_to_history(HealthCheckResult(self.url, HealthStatus.ONLINE, response_time_ms=float(i)))
+            checker.flush()
+            self.assertLessEqual(len(self._history_lines(checker)), 2 * 3)
+
+        reloaded = self._new_checker()
+        self.assertEqual([r.response_time_ms for r in reloaded._history], [7.0, 8.0, 9.0])
+
+
+class TestHourlyCounters(unittest.TestCase):
+    """Testes para os contadores por hora de HealthMetrics"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.url = "https://api.example.com"
+        self.metrics = HealthMetrics()
+        self.now = time.time()
+
+    def test_counts_current_hour(self):
+        """Resultados da hora corrente entram no resumo da última hora"""
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now, 100.0))
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.OFFLINE, self.now))
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now, 300.0))
+
+        self.assertTrue(self.metrics.has_hourly_data)
+        self.assertEqual(self.metrics.hourly_summary(1), (3, 2, 400.0, 2))
+
+    def test_window_excludes_older_hours(self):
+        """O resumo de N horas ignora slots mais antigos que a janela"""
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now - 5 * 3600, 50.0))
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now, 150.0))
+
+        self.assertEqual(self.metrics.hourly_summary(1), (1, 1, 150.0, 1))
+        self.assertEqual(self.metrics.hourly_summary(24), (2, 2, 200.0, 2))
+
+    def test_slot_is_reset_when_the_ring_wraps(self):
+        """A mesma posição 24h depois descarta a contagem antiga"""
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.OFFLINE, self.now - 24 * 3600))
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now, 80.0))
+
+        self.assertEqual(self.metrics.hourly_summary(24), (1, 1, 80.0, 1))
+
+    def test_result_older_than_slot_is_ignored(self):
+        """Um resultado atrasado de 24h+ não contamina o slot da hora atual"""
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.ONLINE, self.now, 80.0))
+        self.metrics.add_to_hourly(_result_at(self.url, HealthStatus.OFFLINE, self.now - 24 * 3600))
+
+        self.assertEqual(self.metrics.hourly_summary(24), (1, 1, 80.0, 1))
+
+    def test_counters_are_rebuilt_from_history_on_load(self):
+        """Métricas gravadas sem contadores por hora são reconstruídas do histórico"""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+
+        checker = APIHealthChecker(data_dir=temp_dir)
+        checker._add_to_history(_result_at(self.url, HealthStatus.ONLINE, self.now, 120.0))
+        checker._metrics[self.url] = HealthMetrics(total_checks=1, successful_checks=1)
+        checker._metrics_dirty = True
+        checker.flush()
+        checker._close_history_file()
+
+        reloaded = APIHealthChecker(data_dir=temp_dir)
+        self.addCleanup(reloaded._close_history_file)
+        self.assertEqual(reloaded._metrics[self.url].hourly_summary(1), (1, 1, 120.0, 1))
+
+
+class TestFlushOnClose(unittest.TestCase):
+    """Testes para a gravação pendente dentro de um event loop"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.url = "https://api.example.com"
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_context_manager_persists_pending_results(self):
+        """Sair do async with grava histórico e métricas antes do flush periódico"""
+        async def go():
+            async with APIHealthChecker(data_dir=self.temp_dir) as checker:
+                result = HealthCheckResult(self.url, HealthStatus.ONLINE, response_time_ms=50.0)
+                checker._add_to_history(result)
+                checker._update_metrics(result)
+
+        asyncio.run(go())
+
+        reloaded = APIHealthChecker(data_dir=self.temp_dir)
+        self.addCleanup(reloaded._close_history_file)
+        self.assertEqual([r.response_time_ms for r in reloaded._history], [50.0])
+        self.assertEqual(reloaded.get_metrics(self.url).total_checks, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Testes para o HealthIntegrationManager
+======================================
+
+Cobre o processamento de mudanças de status:
+- Alerta de downtime prolongado
+- Descarte do estado de URLs não vistas (TTL e limite)
+
+E a fila de notificações do Discord (agrupamento e token bucket).
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+from unittest.mock import patch, AsyncMock
+from datetime import datetime, timezone, timedelta
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from auto_uploader import health_integration
+from auto_uploader.health_checker import HealthCheckResult, HealthStatus, HealthMetrics
+from auto_uploader.health_integration import HealthIntegrationManager
+
+
+class TestProcessStatusChanges(unittest.IsolatedAsyncioTestCase):
+    """Testes para _process_status_changes"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = HealthIntegrationManager(data_dir=self.temp_dir)
+        self.offline_url = "https://offline.example.com"
+        self.online_url = "https://online.example.com"
+
+    async def asyncTearDown(self):
+        """Encerra o worker de notificações"""
+        await self.manager.aclose()
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _downtime_metrics(self):
+        metrics = HealthMetrics(total_checks=10, consecutive_failures=5)
+        metrics.last_offline = (datetime.now(timezone.utc) - timedelta(minutes=30)).isoformat()
+        return metrics
+
+    async def test_downtime_alert_keeps_monotonic_seen_at(self):
+        """O alerta de downtime não pode trocar o relógio usado no descarte de estado"""
+        results = {
+            self.offline_url: HealthCheckResult(self.offline_url, HealthStatus.OFFLINE, error_message="Timeout"),
+            self.online_url: HealthCheckResult(self.online_url, HealthStatus.ONLINE, response_time_ms=100),
+        }
+        checker = self.manager.health_checker
+
+        with patch.object(checker, 'should_notify_downtime', return_value=True), \
+             patch.object(checker, 'get_metrics', return_value=self._downtime_metrics()), \
+             patch.object(self.manager, '_enqueue_notification') as mock_enqueue:
+            await self.manager._process_status_changes(results)
+            # Segundo ciclo: o descarte roda sobre os valores gravados no primeiro
+            await self.manager._process_status_changes(results)
+
+        kind, url, (_, downtime_minutes, failures) = mock_enqueue.call_args_list[0].args
+        self.assertEqual(kind, "downtime_alert")
+        self.assertEqual(url, self.offline_url)
+        self.assertGreaterEqual(downtime_minutes, 29)
+        self.assertEqual(failures, 5)
+        self.assertTrue(self.manager._notification_sent_for_downtime[self.offline_url])
+
+        for seen in self.manager._status_seen_at.values():
+            self.assertIsInstance(seen, float)
+
+    async def test_prune_drops_expired_urls(self):
+        """URLs não vistas há mais que o TTL saem do estado"""
+        stale_url = "https://stale.example.com"
+        self.manager._status_seen_at[stale_url] = 0.0
+        self.manager._previous_statuses[stale_url] = HealthStatus.ONLINE
+
+        results = {
+            self.online_url: HealthCheckResult(self.online_url, HealthStatus.ONLINE, response_time_ms=100),
+        }
+        with patch.object(health_integration, '_STATUS_STATE_TTL', 1), \
+             patch.object(health_integration.time, 'monotonic', return_value=100.0):
+            await self.manager._process_status_changes(results)
+
+        self.assertNotIn(stale_url, self.manager._status_seen_at)
+        self.assertNotIn(stale_url, self.manager._previous_statuses)
+        self.assertIn(self.online_url, self.manager._status_seen_at)
+
+    async def test_prune_respects_max_size(self):
+        """Acima do limite, as URLs vistas há mais tempo são descartadas primeiro"""
+        results = {
+            f"https://api{i}.example.com": HealthCheckResult(f"https://api{i}.example.com", HealthStatus.ONLINE)
+            for i in range(5)
+        }
+        with patch.object(health_integration, '_STATUS_STATE_MAXSIZE', 3):
+            await self.manager._process_status_changes(results)
+
+        self.assertEqual(
+            list(self.manager._status_seen_at),
+            [f"https://api{i}.example.com" for i in range(2, 5)]
+        )
+        self.assertNotIn("https://api0.example.com", self.manager._previous_statuses)
+
+
+class TestNotificationQueue(unittest.IsolatedAsyncioTestCase):
+    """Testes para a fila de notificações do Discord"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = HealthIntegrationManager(data_dir=self.temp_dir)
+        self.url = "https://api.example.com"
+        self.sent = []
+        notifier = self.manager.discord_notifier
+        for name in ('notify_status_change', 'notify_downtime_alert'):
+            patcher = patch.object(notifier, name, new=AsyncMock(side_effect=self._record(name)))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        """Encerra o worker de notificações"""
+        await self.manager.aclose()
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record(self, name):
+        async def record(*args):
+            self.sent.append((name, args, asyncio.get_running_loop().time()))
+        return record
+
+    def _status_change(self, status, previous):
+        return ("status_change", self.url, (HealthCheckResult(self.url, status), previous))
+
+    async def test_duplicate_keys_are_coalesced(self):
+        """Notificações pendentes do mesmo (tipo, url) viram uma só, com os dados mais recentes"""
+        self.manager._enqueue_notification("downtime_alert", self.url, (self.url, 10, 3))
+        self.manager._enqueue_notification("downtime_alert", self.url, (self.url, 20, 6))
+
+        self.assertEqual(self.manager._notify_queue.qsize(), 1)
+        await self.manager._drain_notifications()
+
+        self.assertEqual([(name, args) for name, args, _ in self.sent],
+                         [("notify_downtime_alert", (self.url, 20, 6))])
+
+    async def test_status_change_back_to_original_is_dropped(self):
+        """Uma mudança que volta ao status original antes do envio é descartada"""
+        self.manager._enqueue_notification(*self._status_change(HealthStatus.OFFLINE, HealthStatus.ONLINE))
+        self.manager._enqueue_notification(*self._status_change(HealthStatus.DEGRADED, HealthStatus.OFFLINE))
+        self.assertEqual(self.manager._pending_notifications[("status_change", self.url)][1], HealthStatus.ONLINE)
+
+        self.manager._enqueue_notification(*self._status_change(HealthStatus.ONLINE, HealthStatus.DEGRADED))
+        await self.manager._drain_notifications()
+
+        self.assertEqual(self.sent, [])
+
+    async def test_token_refill_paces_sends(self):
+        """Esgotada a rajada, cada envio espera a reposição de um token"""
+        with patch.object(health_integration, '_NOTIFY_BUCKET_CAPACITY', 2), \
+             patch.object(health_integration, '_NOTIFY_BUCKET_INTERVAL', 0.2):
+            start = asyncio.get_running_loop().time()
+            for i in range(4):
+                url = f"https://api{i}.example.com"
+                self.manager._enqueue_notification("downtime_alert", url, (url, 10, 3))
+            await self.manager._drain_notifications()
+
+        elapsed = [sent_at - start for _, _, sent_at in self.sent]
+        self.assertEqual(len(elapsed), 4)
+        # Taxa de 2 tokens a cada 0,2s: 0,1s por envio depois da rajada
+        self.assertLess(elapsed[1], 0.05)
+        self.assertGreaterEqual(elapsed[2], 0.09)
+        self.assertGreaterEqual(elapsed[3] - elapsed[2], 0.09)
+
+    async def test_aclose_drains_pending_notifications(self):
+        """aclose() envia o que estiver na fila antes de parar o worker"""
+        for i in range(3):
+            url = f"https://api{i}.example.com"
+            self.manager._enqueue_notification("downtime_alert", url, (url, 10, 3))
+        worker = self.manager._notify_worker
+
+        await self.manager.aclose()
+
+        self.assertEqual(len(self.sent), 3)
+        self.assertIsNone(self.manager._notify_worker)
+        await asyncio.sleep(0)
+        self.assertTrue(worker.cancelled() or worker.done())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Testes para as rotas de Health Check
+====================================
+
+Cobre o endpoint /health/api/status:
+- ETag fraco derivado das verificações mais recentes
+- 304 Not Modified enquanto não houver verificação nova
+
+E o acesso ao estado do health manager pelo event loop persistente.
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from flask import Flask
+
+from auto_uploader import health_routes
+from auto_uploader.health_checker import HealthCheckResult, HealthStatus
+from auto_uploader.health_integration import HealthIntegrationManager
+
+
+class HealthRoutesTestCase(unittest.TestCase):
+    """Base: app Flask com health_bp e um health manager com loop próprio"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.url = "https://api.example.com/health"
+        self.manager = HealthIntegrationManager(data_dir=self.temp_dir)
+        self.manager._loop = health_routes._start_background_loop()
+        self.addCleanup(self._stop_loop)
+
+        app = Flask(__name__)
+        app.register_blueprint(health_routes.health_bp)
+        self.client = app.test_client()
+
+        patchers = (
+            patch.object(health_routes, 'health_manager', self.manager),
+            patch.object(health_routes, 'get_provider_urls', return_value=(self.url,)),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _stop_loop(self):
+        loop = self.manager._loop
+        asyncio.run_coroutine_threadsafe(self.manager.aclose(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record_check(self, status, timestamp):
+        result = HealthCheckResult(self.url, status, response_time_ms=100.0, timestamp=timestamp)
+        self.manager.health_checker._last_check_cache[self.url] = result
+        self.manager.clear_dashboard_cache()
+
+
+class TestApiStatusEtag(HealthRoutesTestCase):
+    """Testes para o ETag de /health/api/status"""
+
+    def test_response_carries_weak_etag(self):
+        """A resposta completa traz um ETag fraco"""
+        self._record_check(HealthStatus.ONLINE, "2025-10-15T12:00:00+00:00")
+
+        response = self.client.get('/health/api/status')
+
+        self.assertEqual(response.status_code, 200)
+        etag, weak = response.get_etag()
+        self.assertTrue(weak)
+        self.assertEqual(etag, self.manager.get_dashboard_etag([self.url]))
+
+    def test_matching_etag_returns_304_without_building_data(self):
+        """Com If-None-Match igual, responde 304 sem montar o dashboard"""
+        self._record_check(HealthStatus.ONLINE, "2025-10-15T12:00:00+00:00")
+        first = self.client.get('/health/api/status')
+
+        with patch.object(self.manager, 'get_health_dashboard_data') as mock_data:
+            second = self.client.get(
+                '/health/api/status',
+                headers={'If-None-Match': first.headers['ETag']}
+            )
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        mock_data.assert_not_called()
+
+    def test_new_check_changes_etag(self):
+        """Uma verificação nova invalida o ETag anterior"""
+        self._record_check(HealthStatus.ONLINE, "2025-10-15T12:00:00+00:00")
+        first = self.client.get('/health/api/status')
+
+        self._record_check(HealthStatus.OFFLINE, "2025-10-15T12:05:00+00:00")
+        second = self.client.get(
+            '/health/api/status',
+            headers={'If-None-Match': first.headers['ETag']}
+        )
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers['ETag'], first.headers['ETag'])
+
+
+class TestStateAccessOnLoop(HealthRoutesTestCase):
+    """As rotas leem e alteram o estado do manager só na thread do event loop"""
+
+    def _thread_recorder(self, target, name):
+        threads = []
+        original = getattr(target, name)
+
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        patcher = patch.object(target, name, side_effect=wrapper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return threads
+
+    def test_status_is_built_on_loop_thread(self):
+        """/api/status calcula ETag e dados no loop"""
+        etag_threads = self._thread_recorder(self.manager, 'get_dashboard_etag')
+        data_threads = self._thread_recorder(self.manager, 'get_health_dashboard_data')
+
+        self.assertEqual(self.client.get('/health/api/status').status_code, 200)
+
+        self.assertEqual(etag_threads, ["health-loop"])
+        self.assertEqual(data_threads, ["health-loop"])
+
+    def test_metrics_history_and_config_on_loop_thread(self):
+        """Métricas, histórico, notificações e configuração passam pelo loop"""
+        self._record_check(HealthStatus.ONLINE, "2025-10-15T12:00:00+00:00")
+        self.manager.health_checker._update_metrics(self.manager.health_checker._last_check_cache[self.url])
+        checker = self.manager.health_checker
+        threads = {
+            name: self._thread_recorder(checker, name)
+            for name in ('get_uptime_summaries', 'get_recent_history', 'update_config')
+        }
+        threads['get_notification_history'] = self._thread_recorder(
+            self.manager.discord_notifier, 'get_notification_history'
+        )
+
+        self.assertEqual(self.client.get(f'/health/api/metrics/{self.url}').status_code, 200)
+        self.assertEqual(self.client.get('/health/api/notifications').status_code, 200)
+        response = self.client.post('/health/api/config', json={"config": {"max_history_entries": 50}})
+        self.assertEqual(response.status_code, 200)
+
+        for name, seen in threads.items():
+            self.assertEqual(seen, ["health-loop"], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
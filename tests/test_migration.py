@@ -115,6 +115,12 @@ class TestOldFormatMigrator:
         assert self.migrator.detect_scan_from_url("") == "unknown"
         assert self.migrator.detect_scan_from_url("invalid-url") == "unknown"
     
+    def test_detect_scan_from_url_suffix_match(self):
+        """Testa que domínios mapeados casam por sufixo, não por substring"""
+        assert self.migrator.detect_scan_from_url("https://cdn.slimeread.com/obra") == "slimeread"
+        assert self.migrator.detect_scan_from_url("https://notslimeread.com/obra") == "notslimeread_com"
+        assert self.migrator.detect_scan_from_url("https://astratoons.com.br/obra") == "astratoons_com_br"
+    
     def test_convert_obra_to_new_format(self):
         """Testa conversão de obra para novo formato"""
         old_obra = {
@@ -0,0 +1,197 @@
+"""
+Testes para o ExampleProvider (get_update otimizado)
+====================================================
+
+Cobre a leitura da seção de recentes contra um servidor local:
+- Paginação até o cursor do último capítulo visto
+- GET condicional (ETag) com 304
+- Cache das páginas de recentes e fallback em falha de rede
+- Nova tentativa após 429
+"""
+
+import unittest
+import tempfile
+import shutil
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.auto_uploader.provider_example import ExampleProvider, _parse_recents_page
+
+
+def _item(slug, chapters):
+    """HTML de uma obra na seção de recentes; chapters = [(sufixo, data ISO)]"""
+    html = f'<div class="item"><a class="manga" href="/{slug}">{slug.title()}</a>'
+    for suffix, date in chapters:
+        html += f'<a class="chapter" href="/{slug}/cap-{suffix}">Cap {suffix} <time datetime="{date}"></time></a>'
+    return html + '</div>'
+
+
+class TestParseRecentsPage(unittest.TestCase):
+    """Testes para _parse_recents_page"""
+
+    def test_rows(self):
+        """Extrai número (int quando inteiro), URLs e data de cada capítulo"""
+        body = ('<div class="latest">'
+                + _item('manga-a', [('126', '2025-10-15T12:00:00+00:00'), ('45-5', '2025-10-15T11:00:00+00:00')])
+                + '<div class="item"><a class="manga" href="/b">B</a><a class="chapter" href="/b/extra">x</a></div>'
+                + '</div>').encode()
+
+        rows = _parse_recents_page(body)
+
+        self.assertEqual([(r[0], r[1], r[2], r[3], r[4]) for r in rows], [
+            ('Manga-A', '/manga-a', 126, '/manga-a/cap-126', '2025-10-15T12:00:00+00:00'),
+            ('Manga-A', '/manga-a', 45.5, '/manga-a/cap-45-5', '2025-10-15T11:00:00+00:00'),
+        ])
+        self.assertIsInstance(rows[0][2], int)
+        self.assertEqual(rows[0][5], 1760529600.0)
+
+
+class TestExampleProviderUpdates(unittest.IsolatedAsyncioTestCase):
+    """Testes para ExampleProvider.get_update_async"""
+
+    async def asyncSetUp(self):
+        """Servidor local com as páginas de recentes e um provider apontado para ele"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pages = {}
+        self.requests = []
+        self.etag = None
+        self.throttle_next = 0
+
+        app = web.Application()
+        app.router.add_get('/latest', self._latest)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = aiohttp.ClientSession()
+
+        # Classe própria por teste: cursor, cache e limitador não vazam entre testes
+        self.provider_class = type('TestProvider', (ExampleProvider,), {
+            'name': f'test_provider_{id(self)}',
+            'domain': [f'test-{id(self)}.local'],
+            'base_url': str(self.server.make_url('')).rstrip('/'),
+            'state_dir': self.temp_dir,
+            'recents_cache_ttl': 0.0,
+            '_recents_cache': {},
+        })
+        self.provider = self.provider_class()
+
+    async def asyncTearDown(self):
+        """Fecha sessão e servidor"""
+        await self.session.close()
+        await self.server.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _latest(self, request):
+        page = int(request.query.get('page', 1))
+        self.requests.append((page, request.headers.get('If-None-Match')))
+
+        if self.throttle_next:
+            self.throttle_next -= 1
+            return web.Response(status=429, headers={'Retry-After': '0'})
+
+        headers = {}
+        if page == 1 and self.etag is not None:
+            if request.headers.get('If-None-Match') == self.etag:
+                return web.Response(status=304, headers={'ETag': self.etag})
+            headers['ETag'] = self.etag
+
+        body = '<div class="latest">' + self.pages.get(page, '') + '</div>'
+        return web.Response(text=body, content_type='text/html', headers=headers)
+
+    async def _update(self):
+        result = await self.provider.get_update_async(self.session)
+        return [(obra['url_relativa'], [c['numero'] for c in obra['capitulos']]) for obra in result]
+
+    async def test_first_run_reads_only_first_page(self):
+        """Sem cursor só a primeira página é lida, e o cursor é gravado"""
+        self.pages = {
+            1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')]),
+            2: _item('manga-b', [('10', '2025-10-14T12:00:00+00:00')]),
+        }
+
+        self.assertEqual(await self._update(), [('/manga-a', [126])])
+        self.assertEqual([page for page, _ in self.requests], [1])
+        self.assertEqual(self.provider._load_state()['last_seen_chapter_ts'], 1760529600.0)
+
+    async def test_pages_until_cursor(self):
+        """Com cursor, lê páginas até o último capítulo visto e só devolve os novos"""
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+        await self._update()
+
+        self.pages = {
+            1: _item('manga-c', [('3', '2025-10-17T12:00:00+00:00')]),
+            2: _item('manga-a', [('127', '2025-10-16T12:00:00+00:00')]),
+            3: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')]),
+            4: _item('manga-z', [('1', '2025-10-01T12:00:00+00:00')]),
+        }
+        self.requests.clear()
+
+        self.assertEqual(await self._update(), [('/manga-c', [3]), ('/manga-a', [127])])
+        self.assertEqual([page for page, _ in self.requests], [1, 2, 3])
+
+        self.requests.clear()
+        self.assertEqual(await self._update(), [])
+        self.assertEqual([page for page, _ in self.requests], [1])
+
+    async def test_conditional_get_returns_empty_on_304(self):
+        """O ETag da primeira página é reenviado; 304 devolve lista vazia"""
+        self.etag = '"v1"'
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+
+        self.assertEqual(await self._update(), [('/manga-a', [126])])
+        self.assertEqual(self.provider._load_state()['etag'], '"v1"')
+
+        self.assertEqual(await self._update(), [])
+        self.assertEqual(self.requests[-1], (1, '"v1"'))
+
+    async def test_recents_cache_skips_network(self):
+        """Página ainda válida no cache não gera requisição"""
+        self.provider_class.recents_cache_ttl = 60.0
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+
+        await self._update()
+        await self._update()
+
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_stale_cache_used_on_network_error(self):
+        """Falha de rede com cópia expirada no cache usa a cópia; sem cópia, NotImplementedError"""
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+        await self._update()
+        self.provider._save_state({})
+
+        await self.server.close()
+        self.assertEqual(await self._update(), [('/manga-a', [126])])
+
+        self.provider_class._recents_cache.clear()
+        with self.assertRaises(NotImplementedError):
+            await self._update()
+
+    async def test_retries_after_429(self):
+        """429 reduz a concorrência do domínio e a página é pedida de novo"""
+        self.throttle_next = 1
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+        initial = self.provider.limiter.concurrency
+
+        self.assertEqual(await self._update(), [('/manga-a', [126])])
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.provider.limiter.concurrency, max(1, initial // 2))
+
+    async def test_gives_up_after_max_attempts(self):
+        """429 em todas as tentativas cai no fallback (NotImplementedError)"""
+        self.throttle_next = ExampleProvider.max_attempts
+        self.pages = {1: _item('manga-a', [('126', '2025-10-15T12:00:00+00:00')])}
+
+        with self.assertRaises(NotImplementedError):
+            await self._update()
+        self.assertEqual(len(self.requests), ExampleProvider.max_attempts)
+
+
+if __name__ == '__main__':
+    unittest.main()
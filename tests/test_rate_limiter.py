@@ -0,0 +1,184 @@
+"""
+Testes para o RateLimiter dos providers
+=======================================
+
+Cobre o limitador por domínio:
+- Token bucket (rps/burst)
+- Concorrência adaptativa (AIMD) a partir do status HTTP
+- Pausa pelo Retry-After
+- Vagas de concorrência por event loop
+"""
+
+import unittest
+import asyncio
+import time
+from unittest.mock import patch
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from core.providers.infra.template import base
+from core.providers.infra.template.base import RateLimiter
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Testes para o saldo de tokens"""
+
+    def test_burst_then_rps(self):
+        """O burst sai sem espera; as reservas seguintes esperam 1/rps cada"""
+        with patch.object(base.time, 'monotonic', return_value=100.0):
+            limiter = RateLimiter(rps=2, burst=2, max_concurrency=4)
+            waits = [limiter._reserve() for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+
+    def test_tokens_refill_over_time(self):
+        """Tokens voltam com o tempo, limitados ao burst"""
+        with patch.object(base.time, 'monotonic', return_value=100.0):
+            limiter = RateLimiter(rps=1, burst=2, max_concurrency=4)
+            limiter._reserve()
+            limiter._reserve()
+        with patch.object(base.time, 'monotonic', return_value=200.0):
+            waits = [limiter._reserve() for _ in range(3)]
+
+        self.assertEqual(waits, [0.0, 0.0, 1.0])
+
+
+class TestAimd(unittest.TestCase):
+    """Testes para o ajuste da concorrência"""
+
+    def setUp(self):
+        """Configuração antes de cada teste"""
+        self.limiter = RateLimiter(rps=100, burst=100, max_concurrency=4)
+
+    def test_additive_increase_every_success_step(self):
+        """+1 de concorrência a cada SUCCESS_STEP respostas ok"""
+        for _ in range(RateLimiter.SUCCESS_STEP - 1):
+            self.assertFalse(self.limiter.record_response(200))
+        self.assertEqual(self.limiter.concurrency, 4)
+
+        self.limiter.record_response(200)
+        self.assertEqual(self.limiter.concurrency, 5)
+
+    def test_increase_is_capped(self):
+        """A concorrência não passa de MAX_CONCURRENCY"""
+        for _ in range(RateLimiter.SUCCESS_STEP * 50):
+            self.limiter.record_response(304)
+        self.assertEqual(self.limiter.concurrency, RateLimiter.MAX_CONCURRENCY)
+
+    def test_multiplicative_decrease_on_429_and_503(self):
+        """429 e 503 cortam a concorrência pela metade, até MIN_CONCURRENCY"""
+        self.assertTrue(self.limiter.record_response(429, '0'))
+        self.assertEqual(self.limiter.concurrency, 2)
+        self.assertTrue(self.limiter.record_response(503, '0'))
+        self.assertEqual(self.limiter.concurrency, 1)
+        self.limiter.record_response(429, '0')
+        self.assertEqual(self.limiter.concurrency, RateLimiter.MIN_CONCURRENCY)
+
+    def test_throttle_resets_success_count(self):
+        """Sucessos anteriores a um 429 não contam para o próximo aumento"""
+        for _ in range(RateLimiter.SUCCESS_STEP - 1):
+            self.limiter.record_response(200)
+        self.limiter.record_response(429, '0')
+        self.limiter.record_response(200)
+        self.assertEqual(self.limiter.concurrency, 2)
+
+    def test_other_errors_do_not_change_concurrency(self):
+        """Erros que não são de limite (404, 500) não mexem na concorrência"""
+        self.assertFalse(self.limiter.record_response(404))
+        self.assertFalse(self.limiter.record_response(500))
+        self.assertEqual(self.limiter.concurrency, 4)
+        self.assertEqual(self.limiter._successes, 0)
+
+    def test_retry_after_sets_pause(self):
+        """O Retry-After vira pausa; inválido vale 1s e o máximo é MAX_RETRY_AFTER"""
+        with patch.object(base.time, 'monotonic', return_value=100.0):
+            self.limiter.record_throttled('3')
+            self.assertEqual(self.limiter._paused_until, 103.0)
+            self.limiter.record_throttled('data inválida')
+            self.assertEqual(self.limiter._paused_until, 103.0)
+            self.limiter.record_throttled('1000')
+            self.assertEqual(self.limiter._paused_until, 100.0 + RateLimiter.MAX_RETRY_AFTER)
+
+        limiter = RateLimiter(rps=100, burst=100, max_concurrency=4)
+        with patch.object(base.time, 'monotonic', return_value=100.0):
+            limiter.record_throttled(None)
+            self.assertEqual(limiter._paused_until, 101.0)
+
+
+class TestAcquire(unittest.IsolatedAsyncioTestCase):
+    """Testes para acquire()"""
+
+    async def _run_jobs(self, limiter, count, hold=0.01, on_done=None):
+        state = {'current': 0, 'peak': 0}
+
+        async def job():
+            async with limiter.acquire():
+                state['current'] += 1
+                state['peak'] = max(state['peak'], state['current'])
+                await asyncio.sleep(hold)
+                state['current'] -= 1
+            if on_done is not None:
+                on_done()
+
+        await asyncio.gather(*(job() for _ in range(count)))
+        return state['peak']
+
+    async def test_concurrency_limit(self):
+        """Nunca há mais requisições em andamento que o limite atual"""
+        limiter = RateLimiter(rps=1000, burst=1000, max_concurrency=2)
+        peak = await self._run_jobs(limiter, 10)
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter._get_slots()[1], 0)
+
+    async def test_growing_limit_releases_waiters(self):
+        """Com o limite subindo durante a execução, mais tarefas passam a rodar juntas"""
+        limiter = RateLimiter(rps=1000, burst=1000, max_concurrency=1)
+        with patch.object(RateLimiter, 'SUCCESS_STEP', 1):
+            peak = await self._run_jobs(limiter, 20, on_done=lambda: limiter.record_response(200))
+        self.assertGreater(peak, 1)
+        self.assertGreater(limiter.concurrency, 1)
+
+    async def test_pause_delays_next_acquire(self):
+        """Depois de um 429, o próximo acquire aguarda o Retry-After"""
+        limiter = RateLimiter(rps=1000, burst=1000, max_concurrency=4)
+        limiter.record_response(429, '0.2')
+
+        start = time.monotonic()
+        async with limiter.acquire():
+            elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.15)
+
+    async def test_slot_released_on_error(self):
+        """Uma exceção dentro do acquire devolve a vaga"""
+        limiter = RateLimiter(rps=1000, burst=1000, max_concurrency=1)
+        with self.assertRaises(RuntimeError):
+            async with limiter.acquire():
+                raise RuntimeError("falha")
+
+        async with limiter.acquire():
+            self.assertEqual(limiter._get_slots()[1], 1)
+        self.assertEqual(limiter._get_slots()[1], 0)
+
+
+class TestSlotsPerLoop(unittest.TestCase):
+    """Testes para as vagas por event loop"""
+
+    def test_slots_are_per_event_loop(self):
+        """Cada event loop tem suas próprias vagas (objetos asyncio presos ao loop)"""
+        limiter = RateLimiter(rps=1000, burst=1000, max_concurrency=1)
+
+        async def slots():
+            async with limiter.acquire():
+                return limiter._get_slots()
+
+        first = asyncio.run(slots())
+        second = asyncio.run(slots())
+        self.assertIsNot(first, second)
+        self.assertEqual(second[1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()